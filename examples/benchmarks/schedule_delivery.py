@@ -0,0 +1,124 @@
+"""
+Benchmark of the schedule delivery from the controller host to the computing
+hosts. For every network size, the controller host sends each computing host its
+own schedule and waits for the acknowledgements, without running the clock.
+"""
+import json
+import sys
+import time
+
+sys.path.append("../../")
+
+from qunetsim.components import Network
+from qunetsim.objects import Logger
+from interlinq import ControllerHost, Circuit, Clock, Operation, Qubit
+from interlinq.components.controller_host import NumpyEncoder
+
+Logger.DISABLED = True
+
+NETWORK_SIZES = [2, 4, 8, 16, 32, 64]
+GATES_PER_HOST = 50
+REPETITIONS = 3
+
+
+def create_circuit(q_map):
+    """
+    Create a circuit with a sequence of single qubit gates on every computing host
+
+    Args:
+        q_map (dict): The qubit IDs of every computing host
+
+    Returns:
+        (Circuit): The circuit
+    """
+    qubits = []
+    for computing_host_id, qubit_ids in q_map.items():
+        qubit = Qubit(computing_host_id=computing_host_id, q_id=qubit_ids[0])
+        for _ in range(GATES_PER_HOST):
+            qubit.single(gate=Operation.H)
+        qubit.measure()
+        qubits.append(qubit)
+
+    return Circuit(q_map, qubits=qubits)
+
+
+def payload_sizes(controller_host, circuit):
+    """
+    Size of the schedule payload parsed by every computing host, when it is sent
+    per host and when all the schedules are broadcast
+
+    Returns:
+        (tuple): The mean per host payload size and the broadcast payload size,
+            in bytes
+    """
+    distributed_circuit = controller_host._generate_distributed_circuit(circuit)
+    schedules, _, _ = controller_host._create_distributed_schedules(distributed_circuit)
+
+    per_host = [len(json.dumps(s, cls=NumpyEncoder)) for s in schedules.values()]
+    broadcast = len(json.dumps(schedules, cls=NumpyEncoder))
+    return sum(per_host) / len(per_host), broadcast
+
+
+def main():
+    network = Network.get_instance()
+    network.delay = 0
+    network.start()
+
+    print("hosts  delivery (ms)  per host payload (B)  broadcast payload (B)")
+
+    for num_computing_hosts in NETWORK_SIZES:
+        controller_host = ControllerHost(
+            host_id="host_{0}".format(num_computing_hosts), clock=Clock()
+        )
+        computing_hosts, q_map = controller_host.create_distributed_network(
+            num_computing_hosts=num_computing_hosts,
+            num_qubits_per_host=1,
+            id_prefix="N{0}_QPU_".format(num_computing_hosts),
+        )
+        controller_host.start()
+
+        hosts = computing_hosts + [controller_host]
+        network.add_hosts(hosts)
+
+        circuit = create_circuit(q_map)
+        delivery_times = []
+
+        def controller_host_protocol(host):
+            for _ in range(REPETITIONS):
+                start_time = time.perf_counter()
+                host._send_schedules(circuit)
+                for host_id in host.computing_host_ids:
+                    host.get_next_classical(host_id, wait=-1)
+                delivery_times.append(time.perf_counter() - start_time)
+
+        def computing_host_protocol(host):
+            for _ in range(REPETITIONS):
+                host.receive_schedule()
+
+        threads = [controller_host.run_protocol(controller_host_protocol)]
+        for computing_host in computing_hosts:
+            threads.append(computing_host.run_protocol(computing_host_protocol))
+        for thread in threads:
+            thread.join()
+
+        per_host_payload, broadcast_payload = payload_sizes(controller_host, circuit)
+        print(
+            "{0:5d}  {1:13.1f}  {2:20.0f}  {3:21d}".format(
+                num_computing_hosts,
+                1000 * min(delivery_times),
+                per_host_payload,
+                broadcast_payload,
+            )
+        )
+
+        # The measured qubits cannot be released, so the hosts are stopped
+        # before the network stops the backend
+        for host in hosts:
+            host.stop(release_qubits=False)
+            network.remove_host(host)
+
+    network.stop()
+
+
+if __name__ == "__main__":
+    main()
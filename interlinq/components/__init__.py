@@ -1,3 +1,6 @@
 from .clock import Clock
+from .async_clock import AsyncClock
 from .computing_host import ComputingHost
 from .controller_host import ControllerHost
+from .batch import run_batch
+from .vqe_session import VQESession
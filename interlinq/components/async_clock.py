@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from .clock import Clock
+
+
+class AsyncClock(Clock):
+    """
+    Clock simulator for the coroutine based execution engine. Instead of running
+    the computing hosts on threads, *start_async* awaits the tick coroutines of all
+    the attached computing hosts on a single event loop. The threaded *start* of
+    the Clock is still available.
+    """
+
+    async def _tick_async(self):
+        """
+        Await the schedule coroutines of all the computing hosts for the current
+        tick. If a schedule raises an exception, the error is reported by its
+        computing host and the clock is stopped.
+        """
+        start_time = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                host.perform_schedule_async(self._ticks)
+                for host in self._computing_hosts
+            ),
+            return_exceptions=True,
+        )
+        self._tick_wait_times[self._ticks] = time.perf_counter() - start_time
+
+        for host, result in zip(self._computing_hosts, results):
+            if isinstance(result, Exception):
+                host._report_error(
+                    "Error in the schedule at tick {0}: {1!r}".format(
+                        self._ticks, result
+                    )
+                )
+                self.stop_clock()
+
+    async def start_async(self):
+        """
+        Starts the clock which triggers all the computing hosts to start performing
+        the schedule, on the event loop
+        """
+        if not self._maximum_ticks:
+            raise ValueError("Set the maximum number of ticks to start the clock")
+
+        for _ in self._pending_shots():
+            for _ in self._pending_ticks():
+                await self._tick_async()
+        self.stop_clock()
@@ -0,0 +1,144 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import util
+from typing import Dict, List, Optional, Tuple
+
+from qunetsim.components import Network
+
+from .clock import Clock
+from .controller_host import ControllerHost
+from ..objects import Circuit
+
+
+def _stop_worker_backend():
+    """
+    Terminate the backend processes spawned by a batch worker process, which
+    would otherwise keep the worker from exiting
+    """
+    for process in multiprocessing.active_children():
+        process.terminate()
+
+
+def _start_worker_network():
+    """
+    Start the QuNetSim network of a batch worker process. The network is shared
+    by all the circuits simulated in the worker.
+    """
+    network = Network.get_instance()
+    network.delay = 0
+    network.start()
+
+    util.Finalize(None, _stop_worker_backend, exitpriority=10)
+
+
+def _simulate_circuit(
+    circuit: Circuit,
+    topology: Tuple[int, int],
+    result_type: str,
+    controller_host_id: str,
+    shots: int = 1,
+) -> Dict[str, dict]:
+    """
+    Build an isolated controller host, computing hosts and clock, run a circuit
+    on them and return the results from the controller host.
+
+    Args:
+        circuit (Circuit): The circuit to simulate
+        topology (tuple): The number of computing hosts and the number of qubits
+            per computing host
+        result_type (str): The type of results the computing hosts send back
+        controller_host_id (str): The ID of the controller host
+        shots (int): Number of times the circuit is performed
+
+    Returns:
+        (dict): The final output/error from every computing host
+    """
+
+    network = Network.get_instance()
+    num_computing_hosts, num_qubits_per_host = topology
+
+    controller_host = ControllerHost(host_id=controller_host_id, clock=Clock())
+    computing_hosts, _ = controller_host.create_distributed_network(
+        num_computing_hosts=num_computing_hosts,
+        num_qubits_per_host=num_qubits_per_host,
+    )
+    controller_host.start()
+
+    hosts = computing_hosts + [controller_host]
+    network.add_hosts(hosts)
+
+    def controller_host_protocol(host):
+        host.generate_and_send_schedules(circuit, shots)
+        host.receive_results()
+
+    def computing_host_protocol(host):
+        host.receive_schedule()
+        host.send_results(result_type)
+
+    threads = [controller_host.run_protocol(controller_host_protocol)]
+    for computing_host in computing_hosts:
+        threads.append(computing_host.run_protocol(computing_host_protocol))
+
+    for thread in threads:
+        thread.join()
+
+    for host in hosts:
+        host.stop(release_qubits=False)
+        network.remove_host(host)
+
+    return controller_host.results
+
+
+def run_batch(
+    circuits: List[Circuit],
+    topology: Tuple[int, int],
+    result_type: str = "bits",
+    max_workers: Optional[int] = None,
+    chunk_size: int = 1,
+    controller_host_id: str = "host_1",
+    shots: int = 1,
+) -> List[Dict[str, dict]]:
+    """
+    Simulate independent circuits in parallel worker processes. Every circuit runs
+    on its own controller host, computing hosts and clock, which are built inside
+    the worker processes.
+
+    Args:
+        circuits (list): The Circuit objects to simulate
+        topology (tuple): The number of computing hosts and the number of qubits
+            per computing host, as passed to *create_distributed_network*. The
+            circuits should use the computing host and qubit IDs it creates
+        result_type (str): The type of results the computing hosts send back,
+            either 'bits' or 'expectation'
+        max_workers (int): Number of worker processes. Defaults to the number
+            of processors on the machine
+        chunk_size (int): Number of circuits sent to a worker process at a time
+        controller_host_id (str): The ID of the controller host
+        shots (int): Number of times every circuit is performed, in which case
+            the computing hosts send back the measurement counts
+
+    Returns:
+        (list): The results of the controller host for every circuit, in the
+            same order as *circuits*
+    """
+
+    if chunk_size < 1:
+        raise ValueError("The chunk size should be at least 1")
+
+    simulate = partial(
+        _simulate_circuit,
+        topology=topology,
+        result_type=result_type,
+        controller_host_id=controller_host_id,
+        shots=shots,
+    )
+
+    # Fresh interpreters, since a forked worker would inherit the network and
+    # backend threads of the calling process
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_start_worker_network,
+    ) as executor:
+        return list(executor.map(simulate, circuits, chunksize=chunk_size))
@@ -1,40 +1,66 @@
+import asyncio
+import queue
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional
+
 from qunetsim.objects import DaemonThread
 
 
+def _resolve_stop_waiter(future: asyncio.Future):
+    """
+    Resolve the future of a coroutine waiting for the clock to stop, unless the
+    coroutine was cancelled in the meantime
+    """
+    if not future.done():
+        future.set_result(None)
+
+
 class Clock(object):
     """
     This is a clock simulator which synchronises the scheduled operations in computing
-    hosts
+    hosts. Every clock object is independent, so several groups of controller and
+    computing hosts can run in the same process, each with its own clock.
     """
 
     __instance = None
 
     @staticmethod
     def get_instance():
+        """
+        Get the default clock, which is shared by the hosts that are not given
+        a clock explicitly
+        """
         if Clock.__instance is None:
-            Clock()
+            Clock.__instance = Clock()
         return Clock.__instance
 
     @staticmethod
     def reset_clock():
+        """
+        Stop the default clock and replace it with a new one
+        """
         if Clock.__instance is not None:
             Clock.__instance.stop_clock()
-            Clock.__instance = None
-        __instance = Clock()
+        Clock.__instance = Clock()
 
     def __init__(self):
         """
         Returns the important things for the clock object
         """
-        if Clock.__instance is None:
-            self._ticks = 0
-            self._maximum_ticks = 0
-            self._response = 0
-            self._stop = False
-            self._computing_hosts = []
-            Clock.__instance = self
-        else:
-            raise Exception("This is a singleton class. Use get_instance().")
+        self._ticks = 0
+        self._maximum_ticks = 0
+        self._event_ticks = None
+        self._shots = 1
+        self._response = 0
+        self._response_condition = threading.Condition()
+        self._tick_wait_times = {}
+        self._stop = False
+        self._stopped = threading.Event()
+        self._stop_waiters = []
+        self._stop_waiters_lock = threading.Lock()
+        self._computing_hosts = []
+        self._tick_queues = []
 
     @property
     def ticks(self):
@@ -43,6 +69,17 @@ class Clock(object):
         """
         return self._ticks
 
+    @property
+    def tick_wait_times(self) -> Dict[int, float]:
+        """
+        Wall time, in seconds, the clock spent waiting for the slowest computing
+        host to respond at each tick of the last run
+
+        Returns:
+            (dict): A mapping of the ticks to the time spent waiting on them
+        """
+        return self._tick_wait_times
+
     @property
     def has_stopped(self):
         """
@@ -50,6 +87,35 @@ class Clock(object):
         """
         return self._stop
 
+    def wait_until_stopped(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the clock stops ticking, either because the last tick has
+        been performed or due to an error
+
+        Args:
+            timeout (float): Maximum time in seconds to wait, or None to wait
+                until the clock stops
+
+        Returns:
+            (bool): If the clock has stopped
+        """
+        return self._stopped.wait(timeout)
+
+    async def wait_until_stopped_async(self):
+        """
+        Await until the clock stops ticking, without blocking a thread. The clock
+        resolves the waiting coroutines on their own event loops when it stops.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        with self._stop_waiters_lock:
+            if self._stopped.is_set():
+                return
+            self._stop_waiters.append((loop, future))
+
+        await future
+
     def attach_host(self, computing_host: "ComputingHost"):
         """
         Attach the computing host who will listen to the clock object tick
@@ -66,33 +132,106 @@ class Clock(object):
         Args:
             (ComputingHost): Computing host object which carries out the scheduled task
         """
-        for host in self._computing_hosts:
+        for i, host in enumerate(self._computing_hosts):
             if host.host_id == computing_host.host_id:
-                del host
+                del self._computing_hosts[i]
                 break
 
     def respond(self):
         """
         Track the number of responses received by the clock
         """
-        self._response += 1
+        with self._response_condition:
+            self._response += 1
+            self._response_condition.notify()
 
-    def initialise(self, max_execution_time: int):
+    def initialise(
+        self,
+        max_execution_time: int,
+        event_ticks: Optional[Iterable[int]] = None,
+        shots: int = 1,
+    ):
         """
-        Initialise the clock with the maximum number of times the clock should tick
+        Initialise the clock with the maximum number of times the clock should tick.
+        If *event_ticks* is given, the clock runs in discrete-event mode and only
+        ticks at those values, skipping the idle ticks in between. With more than
+        one shot, the clock runs through the same ticks once per shot.
 
         Args:
-            (int): Maximum number of times the clock should tick
+            max_execution_time (int): Maximum number of times the clock should tick
+            event_ticks (iterable): The ticks at which at least one computing host
+                has an operation scheduled
+            shots (int): Number of times the schedules are performed
         """
+        if shots < 1:
+            raise ValueError("The number of shots should be at least 1")
+
         self._stop = False
+        self._stopped.clear()
         self._maximum_ticks = max_execution_time
+        self._shots = shots
+        self._tick_wait_times = {}
+
+        if event_ticks is None:
+            self._event_ticks = None
+        else:
+            self._event_ticks = sorted(set(event_ticks))
+
+    def _tick(self):
+        """
+        Trigger all the computing hosts to perform the schedule for the current
+        tick and wait until every one of them has responded
+        """
+        total_hosts = len(self._computing_hosts)
+
+        with self._response_condition:
+            self._response = 0
+
+        start_time = time.perf_counter()
+        for tick_queue in self._tick_queues:
+            tick_queue.put(self._ticks)
+
+        # Wait to receive responses from all the computing hosts
+        with self._response_condition:
+            self._response_condition.wait_for(lambda: self._response >= total_hosts)
+        self._tick_wait_times[self._ticks] = time.perf_counter() - start_time
+
+    def _perform_schedule(self, computing_host: "ComputingHost", ticks: int):
+        """
+        Perform the schedule of a computing host for a tick. If the schedule
+        raises an exception, the error is reported by the computing host, which
+        stops the clock, and the tick is still acknowledged, so that the clock is
+        not left waiting on the computing host.
+
+        Args:
+            computing_host (ComputingHost): Computing host which performs the
+                schedule
+            ticks (int): The tick to perform the schedule for
+        """
+        try:
+            computing_host.perform_schedule(ticks)
+        except Exception as error:
+            computing_host._report_error(
+                "Error in the schedule at tick {0}: {1!r}".format(ticks, error)
+            )
+            self.stop_clock()
+            self.respond()
 
     def stop_clock(self):
         """
-        Stop ticking the clock, due to an error being triggered
+        Stop ticking the clock, due to an error being triggered or at the end
+        of the schedule, and notify the computing hosts waiting on it
         """
         self._stop = True
 
+        with self._stop_waiters_lock:
+            self._stopped.set()
+            stop_waiters, self._stop_waiters = self._stop_waiters, []
+
+        for loop, future in stop_waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve_stop_waiter, future)
+
     def start(self):
         """
         Starts the clock which triggers all the computing hosts to start performing
@@ -101,19 +240,108 @@ class Clock(object):
         if not self._maximum_ticks:
             raise ValueError("Set the maximum number of ticks to start the clock")
 
-        # Tick the clock
-        while self._ticks <= self._maximum_ticks:
-            self._response = 0
+        self._start_workers()
+
+        try:
+            for _ in self._pending_shots():
+                for _ in self._pending_ticks():
+                    self._tick()
+        finally:
+            self._stop_workers()
+        self.stop_clock()
+
+    def _pending_shots(self) -> Iterator[int]:
+        """
+        Yield every shot the clock should run, rewinding the ticks to where the
+        run started. With more than one shot, the attached computing hosts complete
+        every shot before the next one starts, which records its measurements and
+        resets their registers. The shots end early if the clock is stopped due to
+        an error.
+
+        Returns:
+            (iterator): The index of every shot
+        """
+        first_tick = self._ticks
+
+        for shot in range(self._shots):
+            self._ticks = first_tick
+            yield shot
+
+            if self._stop:
+                return
+
+            if self._shots > 1:
+                last_shot = shot == self._shots - 1
+                for host in self._computing_hosts:
+                    host.complete_shot(last_shot)
+
+    def _pending_ticks(self) -> Iterator[int]:
+        """
+        Advance the clock and yield every tick at which the computing hosts should
+        be triggered, until the maximum number of ticks is reached or the clock is
+        stopped due to an error. In discrete-event mode, the clock jumps straight
+        from one event tick to the next one.
+
+        Returns:
+            (iterator): The ticks at which the computing hosts are triggered
+        """
+        if self._event_ticks is None:
+            while self._ticks <= self._maximum_ticks:
+                if self._stop:
+                    print("Clock stopped ticking due to an error")
+                    return
+
+                yield self._ticks
+                self._ticks += 1
+            return
+
+        for event_tick in self._event_ticks:
+            if event_tick < self._ticks:
+                continue
+            if event_tick > self._maximum_ticks:
+                break
 
             if self._stop:
                 print("Clock stopped ticking due to an error")
+                return
+
+            self._ticks = event_tick
+            yield self._ticks
+
+        # End in the same state as a clock which stepped through every tick
+        self._ticks = self._maximum_ticks + 1
+
+    def _run_worker(self, computing_host: "ComputingHost", tick_queue: queue.Queue):
+        """
+        Perform the schedule of a computing host for every tick notification
+        received, until the worker is stopped
+
+        Args:
+            computing_host (ComputingHost): Computing host served by the worker
+            tick_queue (Queue): Queue on which the tick notifications arrive
+        """
+        while True:
+            ticks = tick_queue.get()
+            if ticks is None:
                 break
+            self._perform_schedule(computing_host, ticks)
 
-            for host in self._computing_hosts:
-                DaemonThread(host.perform_schedule, args=(self._ticks,))
+    def _start_workers(self):
+        """
+        Start one long-lived worker thread per attached computing host, which
+        performs its schedule whenever the clock ticks
+        """
+        self._tick_queues = []
 
-            # Wait to receive responses from all the computing hosts
-            while self._response < len(self._computing_hosts):
-                pass
-            self._ticks += 1
-        self.stop_clock()
+        for host in self._computing_hosts:
+            tick_queue = queue.Queue()
+            DaemonThread(self._run_worker, args=(host, tick_queue))
+            self._tick_queues.append(tick_queue)
+
+    def _stop_workers(self):
+        """
+        Stop the worker threads of the computing hosts
+        """
+        for tick_queue in self._tick_queues:
+            tick_queue.put(None)
+        self._tick_queues = []
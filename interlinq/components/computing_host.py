@@ -1,18 +1,87 @@
+import asyncio
 import json
+import threading
 import time
-from typing import Optional, Dict
+import zlib
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 from qunetsim.components import Host
-from qunetsim.objects import Qubit
+from qunetsim.objects import Message, Qubit
 
 from .clock import Clock
 from ..objects.operation import Operation
-from ..utils import DefaultOperationTime
+from ..utils import DefaultOperationTime, MatrixCache
 from ..utils.constants import Constants
-from ..utils.vqe_subroutines import expectation_value
-
-MAX_WAIT = 5
+from ..utils.vqe_subroutines import CompiledHamiltonian
+
+
+# Qubit methods which perform the gates supported by the computing host
+SINGLE_GATES = {
+    Operation.I: Qubit.I,
+    Operation.X: Qubit.X,
+    Operation.Y: Qubit.Y,
+    Operation.Z: Qubit.Z,
+    Operation.T: Qubit.T,
+    Operation.H: Qubit.H,
+    Operation.K: Qubit.K,
+    Operation.RX: Qubit.rx,
+    Operation.RY: Qubit.ry,
+    Operation.RZ: Qubit.rz,
+    Operation.CUSTOM: Qubit.custom_gate,
+}
+
+TWO_QUBIT_GATES = {
+    Operation.CNOT: Qubit.cnot,
+    Operation.CPHASE: Qubit.cphase,
+    Operation.CUSTOM_TWO_QUBIT: Qubit.custom_two_qubit_gate,
+    Operation.CUSTOM_CONTROLLED: Qubit.custom_controlled_gate,
+}
+
+# Unitaries of the rotation gates for an angle, as applied by the backends
+ROTATION_GATES = {
+    Operation.RX: lambda theta: np.array([
+        [np.cos(theta / 2), -1j * np.sin(theta / 2)],
+        [-1j * np.sin(theta / 2), np.cos(theta / 2)],
+    ]),
+    Operation.RY: lambda theta: np.array([
+        [np.cos(theta / 2), -np.sin(theta / 2)],
+        [np.sin(theta / 2), np.cos(theta / 2)],
+    ], dtype=complex),
+    Operation.RZ: lambda theta: np.array([
+        [np.exp(-1j * theta / 2), 0],
+        [0, np.exp(1j * theta / 2)],
+    ]),
+}
+
+# Permissible number of qubit IDs, computing host IDs and classical bit IDs of
+# the operations, checked once when the schedule is received
+OPERATION_FORMATS = {
+    Constants.SINGLE: (1, 1, 0),
+    Constants.TWO_QUBIT: (2, 1, 0),
+    Constants.CLASSICAL_CTRL_GATE: (1, 1, 1),
+    Constants.SEND_ENT: (1, 2, 0),
+    Constants.REC_ENT: (1, 2, 0),
+    Constants.SEND_CLASSICAL: (0, 2, 1),
+    Constants.REC_CLASSICAL: (0, 2, 1),
+    Constants.MEASURE: (1, 1, 1),
+    Constants.SAMPLE: (1, 1, 1),
+    Constants.REC_HAMILTON: (0, 1, 0),
+    Constants.SEND_EXP: (0, 1, 0),
+}
+
+MATRIX_GATES = {
+    Operation.CUSTOM,
+    Operation.CUSTOM_TWO_QUBIT,
+    Operation.CUSTOM_CONTROLLED,
+}
+
+# Decoded matrices of the custom gates, keyed by their JSON encoding
+GATE_MATRICES = MatrixCache(Constants.GATE_MATRIX_CACHE_SIZE)
+
+# Matrices of the rotation gates, keyed by the gate name and angle
+ROTATION_MATRICES = MatrixCache(Constants.ROTATION_MATRIX_CACHE_SIZE)
 
 
 class ComputingHost(Host):
@@ -26,9 +95,13 @@ class ComputingHost(Host):
         host_id: str,
         controller_host_id: str,
         total_qubits: int = 0,
-        total_pre_allocated_qubits: int = 1,
+        total_pre_allocated_qubits: int = Constants.DEFAULT_PRE_ALLOCATED_QUBITS,
         gate_time: Optional[Dict[str, int]] = None,
         backend: Optional = None,
+        clock: Optional[Clock] = None,
+        epr_timeout: float = Constants.EPR_TIMEOUT,
+        epr_pool_depth: int = Constants.EPR_POOL_DEPTH,
+        stream_measurements: bool = False,
     ):
 
         """
@@ -44,6 +117,16 @@ class ComputingHost(Host):
             gate_time (dict): A mapping of gate names to time the gate takes to
                execute for this computing host
             backend (Backend): Backend for this host
+            clock (Clock): Clock which synchronises this computing host. The
+               default clock is used if none is given
+            epr_timeout (float): Time in seconds the computing host waits for
+               the EPR half of a pair before reporting an error
+            epr_pool_depth (int): Maximum number of EPR pairs of the schedule
+               shared in advance with each computing host, before the operation
+               which uses them is performed
+            stream_measurements (bool): If the computing host sends every
+               measurement to the controller host as soon as it is performed,
+               as a record [shot, tick, bit_id, bit]
         """
         super().__init__(host_id, backend=backend)
 
@@ -52,24 +135,82 @@ class ComputingHost(Host):
 
         self._total_qubits = total_qubits
         self._total_pre_allocated_qubits = total_pre_allocated_qubits
+        self._epr_timeout = epr_timeout
+        self._epr_pool_depth = epr_pool_depth
+        self._stream_measurements = stream_measurements
+        self._streamed_records = 0
 
         self._qubits = {}
         self._pre_allocated_qubits = {}
         self._bits = {}
 
+        # Register sizes and data qubits of the schedule, restored and released
+        # between the shots of a multi-shot run
+        self._register_sizes = (total_qubits, total_pre_allocated_qubits)
+        self._prepared_qubit_ids = []
+
+        # Bitstring measured in every shot completed for the current schedule,
+        # with the counts of the bitstrings and of every classical bit
+        self._completed_shots = 0
+        self._memory = []
+        self._counts = {}
+        self._bit_counts = {}
+
+        # Qubits left unmeasured by the SAMPLE operations, with the tick of the
+        # operation, until the bits of all the shots are sampled at the end
+        self._sampled_qubits = {}
+        self._sample_shots = 0
+        self._sample_seed = 0
+
         self._error_message = None
 
+        self._hamiltonian = []
+
+        # Set once the expectation value of the Hamiltonian has been calculated
+        self._exp_calculated = threading.Event()
+
         self._schedule = {}
 
+        # Operations of the schedule which take the values of the parameters or
+        # the seed of the sampled shots, as (layer_end, position, operation)
+        self._bound_operations = []
+
+        # EPR pairs of the schedule which are still to be generated, and the
+        # pairs already shared in advance, for every receiving computing host
+        self._epr_pairs = {}
+        self._upcoming_epr_pairs = {}
+        self._epr_pool = {}
+
         if gate_time is None:
             gate_time = DefaultOperationTime
 
         self._gate_time = gate_time
 
-        self._last_buffer_size = 0
+        # Map of the operation names to the methods which perform them, and the
+        # coroutines which replace them in the coroutine based execution engine
+        self._operation_handlers = {
+            Constants.PREPARE_QUBITS: (self._prepare_qubits, None),
+            Constants.SINGLE: (self._process_single_gates, None),
+            Constants.TWO_QUBIT: (self._process_two_qubit_gates, None),
+            Constants.CLASSICAL_CTRL_GATE: (self._process_classical_ctrl_gates, None),
+            Constants.SEND_ENT: (self._process_send_ent, self._process_send_ent_async),
+            Constants.REC_ENT: (self._process_rec_ent, self._process_rec_ent_async),
+            Constants.SEND_CLASSICAL: (
+                self._process_send_classical,
+                self._process_send_classical_async,
+            ),
+            Constants.REC_CLASSICAL: (
+                self._process_rec_classical,
+                self._process_rec_classical_async,
+            ),
+            Constants.MEASURE: (self._process_measurement, None),
+            Constants.SAMPLE: (self._process_sample, None),
+            Constants.REC_HAMILTON: (self._process_rec_hamilton, None),
+            Constants.SEND_EXP: (self._process_send_exp, None),
+        }
 
         # Attach computing host to the clock
-        self._clock = Clock.get_instance()
+        self._clock = clock if clock is not None else Clock.get_instance()
         self._clock.attach_host(self)
 
     @property
@@ -82,6 +223,16 @@ class ComputingHost(Host):
         """
         return self._controller_host_id
 
+    @property
+    def clock(self):
+        """
+        Get the clock which synchronises the computing host
+
+        Returns:
+            (Clock): The clock of the computing host
+        """
+        return self._clock
+
     @property
     def bits(self):
         """
@@ -92,12 +243,26 @@ class ComputingHost(Host):
         """
         results = {}
         for i in self._bits:
-            # Hack to filter out EPR pairs
-            # TODO: Is there a better way to overcome this?
-            if len(i) < 15:
+            if not self._is_internal_bit(i):
                 results[i] = self._bits[i]
         return results
 
+    @staticmethod
+    def _is_internal_bit(bit_id: str) -> bool:
+        """
+        Check if a classical bit is measured by the distributed operations, such
+        as the EPR halves, rather than by the circuit
+
+        Args:
+            bit_id (str): The ID of the classical bit
+
+        Returns:
+            (bool): If the bit is internal to the distributed operations
+        """
+        # Hack to filter out EPR pairs, which have uuid IDs
+        # TODO: Is there a better way to overcome this?
+        return len(bit_id) >= 15
+
     @property
     def qubit_ids(self):
         """
@@ -124,7 +289,8 @@ class ComputingHost(Host):
         Return the currently assigned Hamiltonians for this host.
 
         Returns:
-            (list): A list of the assigned terms of this computing host.
+            (CompiledHamiltonian): The assigned terms of this computing host,
+                or an empty list if none were assigned.
         """
         return self._hamiltonian
 
@@ -139,38 +305,316 @@ class ComputingHost(Host):
 
     def receive_schedule(self):
         """
-        Receive the broadcast schedule from the Controller Host and update
-        the schedule property
+        Receive the schedule of this computing host from the Controller Host and
+        update the schedule property
+        """
+
+        msg = self.get_next_classical(self._controller_host_id, wait=-1)
+        while msg.content == "ACK":
+            msg = self.get_next_classical(self._controller_host_id, wait=-1)
+
+        self._accept_schedule(msg.content)
+
+    def _accept_schedule(self, content: str):
+        """
+        Load a received schedule, and acknowledge it to the Controller Host or
+        reject it if it is not valid
+
+        Args:
+            content (str): The JSON encoded operations of this computing host
+        """
+
+        self._load_schedule(content)
+
+        # Send Acknowledgement of receiving the schedule to the ControllerHost,
+        # or reject the schedule if it is not valid
+        msg = "ACK" if self._error_message is None else Constants.SCHEDULE_REJECTED
+        self.send_classical(self._controller_host_id, msg, await_ack=True)
+
+    def serve_vqe_session(self):
+        """
+        Perform the iterations of a VQE session of the Controller Host. The
+        terms of the Hamiltonian assigned to this computing host are received
+        once and kept, and every schedule which follows is performed on fresh
+        registers and answered with the expectation value of the kept terms,
+        until the Controller Host closes the session.
         """
 
-        messages = []
+        while True:
+            msg = self.get_next_classical(self._controller_host_id, wait=-1)
+            if msg.content == "ACK":
+                continue
 
-        while len(messages) <= self._last_buffer_size:
-            messages = self.classical
-            messages = [x for x in messages if x.content != "ACK"]
+            content = json.loads(msg.content)
+            if isinstance(content, dict) and content["type"] == "close_session":
+                return
+            if isinstance(content, dict) and content["type"] == "hamiltonian":
+                self._hamiltonian = CompiledHamiltonian(content["terms"])
+                continue
 
-        self._last_buffer_size = len(messages)
+            self._accept_schedule(msg.content)
 
-        # Await broadcast messages from the controller host
-        # while len(messages) < 1:
-        #    messages = self.classical
-        #    messages = [x for x in messages if x.content != 'ACK']
+            self.send_results("expectation" if len(self._hamiltonian) > 0 else "bits")
+            self._reset_registers()
+
+    async def receive_schedule_async(self):
+        """
+        Await the schedule of this computing host from the Controller Host and
+        update the schedule property, for the coroutine based execution engine
+        """
+
+        msg = self.get_next_classical(self._controller_host_id, wait=0)
+        while msg is None or msg.content == "ACK":
+            await asyncio.sleep(Constants.ASYNC_POLL_INTERVAL)
+            msg = self.get_next_classical(self._controller_host_id, wait=0)
+
+        self._load_schedule(msg.content)
+
+        # Send Acknowledgement of receiving the schedule to the ControllerHost,
+        # or reject the schedule if it is not valid
+        msg = "ACK" if self._error_message is None else Constants.SCHEDULE_REJECTED
+        self.send_classical(self._controller_host_id, msg)
+
+    def _load_schedule(self, content: str):
+        """
+        Validate the received schedule and update the schedule property. If the
+        schedule is not valid, the schedule is left empty and the error is
+        recorded for the results. The qubits and bits of the previous run are
+        released first, for the schedule as well as for new parameter values.
+
+        Args:
+            content (str): The JSON encoded operations of this computing host
+        """
+
+        self._release_sampled_qubits()
+        self._reset_registers()
+
+        self._error_message = None
+        self._exp_calculated.clear()
+        self._streamed_records = 0
+        self._upcoming_epr_pairs = {}
+        self._epr_pool = {}
+
+        self._register_sizes = (self._total_qubits, self._total_pre_allocated_qubits)
+        self._prepared_qubit_ids = []
+        self._completed_shots = 0
+        self._memory = []
+        self._counts = {}
+        self._bit_counts = {}
 
         # TODO: Add encryption for this message
-        schedules = json.loads(messages[0].content)
+        operations = json.loads(content)
+
+        # The values of the parameters of the schedule which is already held
+        if isinstance(operations, dict):
+            self._bind_parameters(operations)
+            return
+
+        self._schedule = {}
+        self._epr_pairs = {}
+        self._bound_operations = []
+
+        error_message = self._validate_schedule(operations)
+        if error_message is not None:
+            self._error_message = error_message
+            return
+
         schedule = {}
 
-        if self._host_id in schedules:
-            for op in schedules[self._host_id]:
-                if op["layer_end"] in schedule.keys():
-                    schedule[op["layer_end"]].append(op)
-                else:
-                    schedule[op["layer_end"]] = [op]
+        for op in operations:
+            compiled_op = self._compile_operation(op)
+            if compiled_op is None:
+                continue
+
+            if op["name"] == Constants.SEND_ENT:
+                receiver_id = op["computing_host_ids"][1]
+                self._epr_pairs.setdefault(receiver_id, []).append(op["qids"][0])
+
+            # The operations whose values are bound again by the next runs
+            if op["name"] == Constants.SAMPLE or isinstance(op.get("gate_param"), dict):
+                position = len(schedule.get(op["layer_end"], []))
+                self._bound_operations.append((op["layer_end"], position, op))
+
+            if op["layer_end"] in schedule.keys():
+                schedule[op["layer_end"]].append(compiled_op)
+            else:
+                schedule[op["layer_end"]] = [compiled_op]
+
+        # An operation which could not be compiled rejects the whole schedule
+        if self._error_message is not None:
+            self._epr_pairs = {}
+            self._bound_operations = []
+            return
+
         self._schedule = schedule
+        self._reset_upcoming_epr_pairs()
 
-        # Send Acknowledgement of receiving broadcast to the ControllerHost
-        msg = "ACK"
-        self.send_classical(self._controller_host_id, msg, await_ack=True)
+    def _bind_parameters(self, message: dict):
+        """
+        Bind new values to the parameters of the schedule which is already held,
+        and a new seed to its sampled shots, recompiling only the operations
+        which use them. The schedule is moved along by the offset of the ticks
+        the clock starts this run at.
+
+        Args:
+            message (dict): The values of the parameters, the seed and the
+                offset of the ticks
+        """
+
+        if not self._schedule:
+            self._error_message = "No schedule was received to bind the parameters to"
+            return
+
+        # The schedule is moved along to the tick the clock is at for this run
+        offset = message.get("offset", 0)
+        if offset:
+            self._schedule = {
+                layer_end + offset: ops for layer_end, ops in self._schedule.items()
+            }
+
+        bound_operations = []
+        for layer_end, position, op in self._bound_operations:
+            layer_end += offset
+            if op["name"] == Constants.SAMPLE:
+                op = dict(op, seed=message["seed"], layer_end=layer_end)
+            else:
+                name = op["gate_param"]["parameter"]
+                value = message["values"][name]
+                op = dict(op, gate_param={"parameter": name, "value": value},
+                          layer_end=layer_end)
+
+            self._schedule[layer_end][position] = self._compile_operation(op)
+            bound_operations.append((layer_end, position, op))
+
+        self._bound_operations = bound_operations
+
+        self._reset_upcoming_epr_pairs()
+
+    def _reset_upcoming_epr_pairs(self):
+        """
+        Mark every EPR pair of the schedule as still to be generated, with an
+        empty pool for every receiving computing host
+        """
+
+        self._upcoming_epr_pairs = {
+            receiver_id: deque(qubit_ids)
+            for receiver_id, qubit_ids in self._epr_pairs.items()
+        }
+        self._epr_pool = {}
+
+    def _validate_schedule(self, operations: List[dict]) -> Optional[str]:
+        """
+        Check the format of every operation of a schedule once, before the clock
+        starts, so that the operations are performed without any further checks
+
+        Args:
+            operations (list): The operations of the schedule, in the order of
+                execution
+
+        Returns:
+            (str): The error message for the first invalid operation, or None if
+                the schedule is valid
+        """
+
+        has_hamiltonian = len(self._hamiltonian) > 0
+
+        for op in operations:
+            # Unsupported operations are reported when the schedule is compiled
+            if op["name"] not in OPERATION_FORMATS:
+                continue
+
+            len_qids, len_computing_host_ids, len_cids = OPERATION_FORMATS[op["name"]]
+            msg = self._check_errors(
+                op,
+                len_qids=len_qids,
+                len_computing_host_ids=len_computing_host_ids,
+                len_cids=len_cids,
+                has_hamiltonian=has_hamiltonian,
+            )
+            if msg is not None:
+                return msg
+
+            if op["name"] == Constants.REC_HAMILTON:
+                has_hamiltonian = True
+
+        return None
+
+    def _compile_operation(
+        self, operation: dict
+    ) -> Optional[Tuple[Callable, Optional[Callable], tuple]]:
+        """
+        Resolve the methods which perform an operation of the schedule, so that
+        the operation is not looked up again every time the clock ticks
+
+        Args:
+            operation (dict): Dictionary of information regarding the operation
+
+        Returns:
+            (tuple): The method which performs the operation, the coroutine which
+                replaces it in the coroutine based execution engine (or None) and
+                the arguments for both, or None if the operation is not supported,
+                in which case the error is recorded and the schedule is rejected
+        """
+
+        if operation["name"] not in self._operation_handlers:
+            msg = (
+                "Error in the operation name: {0}. Error Message: 'Unsupported "
+                "operation'".format(operation["name"])
+            )
+            self._error_message = msg
+            return None
+
+        handler, async_handler = self._operation_handlers[operation["name"]]
+
+        if operation["name"] in (Constants.SINGLE, Constants.CLASSICAL_CTRL_GATE):
+            gate = self._compile_gate(operation, SINGLE_GATES)
+        elif operation["name"] == Constants.TWO_QUBIT:
+            gate = self._compile_gate(operation, TWO_QUBIT_GATES)
+        else:
+            return handler, async_handler, (operation,)
+
+        if gate is None:
+            return None
+        return handler, async_handler, (operation,) + gate
+
+    def _compile_gate(
+        self, operation: dict, gates: Dict[str, Callable]
+    ) -> Optional[Tuple[Callable, tuple]]:
+        """
+        Resolve the qubit method and parameters of a gate operation
+
+        Args:
+            operation (dict): Dictionary of information regarding the operation
+            gates (dict): Map of the supported gate names to the qubit methods
+
+        Returns:
+            (tuple): The qubit method and its parameters, or None if the gate is
+                not supported, in which case the error is recorded and the schedule
+                is rejected
+        """
+
+        gate = operation["gate"]
+        if gate not in gates:
+            msg = (
+                "Error in the operation name: {0}. Error Message: 'Unsupported "
+                "gate {1}'".format(operation["name"], gate)
+            )
+            self._error_message = msg
+            return None
+
+        if gate in ROTATION_GATES:
+            # The memoised unitary of the rotation replaces the gate itself, with
+            # the value bound to the parameter of a parametric circuit
+            theta = operation["gate_param"]
+            if isinstance(theta, dict):
+                theta = theta["value"]
+            return Qubit.custom_gate, (self.rotation_matrix(gate, theta),)
+        if gate in MATRIX_GATES:
+            gate_args = (self.extract_gate_param(operation),)
+        else:
+            gate_args = ()
+
+        return gates[gate], gate_args
 
     def _report_error(self, message: str):
         """
@@ -183,8 +627,13 @@ class ComputingHost(Host):
         self._error_message = message
 
     def _check_errors(
-        self, op, len_qids: int = 0, len_computing_host_ids: int = 1, len_cids: int = 0
-    ):
+        self,
+        op,
+        len_qids: int = 0,
+        len_computing_host_ids: int = 1,
+        len_cids: int = 0,
+        has_hamiltonian: bool = False,
+    ) -> Optional[str]:
         """
         Check if there is any error in the operation format
 
@@ -195,6 +644,11 @@ class ComputingHost(Host):
                 host IDs in the operation
             len_cids (int): Permissible number of classical bit IDs in the
                 operation
+            has_hamiltonian (bool): If the computing host has received a list of
+                observables before the operation
+
+        Returns:
+            (str): The error message, or None if the operation format is valid
         """
 
         msg = None
@@ -227,21 +681,18 @@ class ComputingHost(Host):
             )
 
         if op["name"] == "REC_HAMILTON" and (
-            len(op["hamiltonian"]) == 0 or op["hamiltonian"] is None
+            op.get("hamiltonian") is None or len(op["hamiltonian"]) == 0
         ):
             msg = (
                 error_msg + "Error Message: 'Received an empty/no list of observables'"
             )
 
-        if op["name"] == "SEND_EXP" and (
-            len(self._hamiltonian) == 0 or self._hamiltonian is None
-        ):
+        if op["name"] == "SEND_EXP" and not has_hamiltonian:
             msg = (
                 error_msg + "Error Message: 'Received an empty/no list of observables'"
             )
 
-        if msg:
-            self._report_error(msg)
+        return msg
 
     def _add_new_qubit(self, qubit: Qubit, qubit_id: str, pre_allocated: bool = False):
         """
@@ -302,21 +753,63 @@ class ComputingHost(Host):
     @staticmethod
     def extract_gate_param(op: dict) -> np.ndarray:
         """
-        Extract gate parameter array as an np array
+        Extract gate parameter array as an np array. The matrix is decoded once
+        for every distinct content, and shared by all the operations using it.
 
         Args:
             op (dict): Dictionary of information regarding the operation
 
         Returns:
-            (np.ndarray): The parameter array.
+            (np.ndarray): The read-only parameter array.
         """
 
         param = op["gate_param"]
-        for i in range(len(param)):
-            for j in range(len(param[0])):
-                if type(param[i][j]) != int:
-                    param[i][j] = param[i][j][0] + param[i][j][1] * 1j
-        return np.asarray(param)
+        key = json.dumps(param, separators=(",", ":"))
+        return GATE_MATRICES.get(key, lambda: ComputingHost._decode_matrix(param))
+
+    @staticmethod
+    def rotation_matrix(gate: str, theta: float) -> np.ndarray:
+        """
+        Get the unitary of a rotation gate, built once for every gate and angle
+        and shared by all the operations using it.
+
+        Args:
+            gate (str): The name of the rotation gate
+            theta (float): The angle of the rotation in radians
+
+        Returns:
+            (np.ndarray): The read-only unitary of the gate
+        """
+
+        theta = float(theta)
+        return ROTATION_MATRICES.get((gate, theta), lambda: ROTATION_GATES[gate](theta))
+
+    @staticmethod
+    def _decode_matrix(param: list) -> np.ndarray:
+        """
+        Convert a matrix of JSON encoded complex [real, imag] pairs, possibly
+        mixed with real entries, into a complex np array
+
+        Args:
+            param (list): The JSON decoded matrix
+
+        Returns:
+            (np.ndarray): The complex matrix
+        """
+
+        try:
+            # Every entry is a [real, imag] pair
+            pairs = np.asarray(param, dtype=float)
+        except ValueError:
+            pairs = None
+
+        if pairs is None or pairs.ndim != 3:
+            pairs = np.asarray([
+                [entry if isinstance(entry, (list, tuple)) else (entry, 0) for entry in row]
+                for row in param
+            ], dtype=float)
+
+        return pairs[..., 0] + 1j * pairs[..., 1]
 
     def _prepare_qubits(self, prepare_qubit_op: dict):
         """
@@ -331,6 +824,7 @@ class ComputingHost(Host):
         for qubit_id in prepare_qubit_op["qids"]:
             qubits[qubit_id] = Qubit(host=self, q_id=qubit_id)
             self.add_data_qubit(self.host_id, qubits[qubit_id], qubit_id)
+            self._prepared_qubit_ids.append(qubit_id)
         self._update_stored_qubits(qubits)
 
     def _merge_qubits(self, qubits: dict):
@@ -341,102 +835,55 @@ class ComputingHost(Host):
             main_qubit.cnot(qubit)
             print("did this", self.host_id)
 
-    def _process_single_gates(self, operation: dict, classical_ctrl_gate: bool = False):
+    def _process_single_gates(self, operation: dict, gate: Callable, gate_args: tuple):
         """
         Follows the operation command to perform single gates on a qubit
 
         Args:
             operation (dict): Dictionary of information regarding the operation
-            classical_ctrl_gate (bool): If the single gate being performed is part of a
-                classical control single gate
+            gate (Callable): The qubit method which performs the gate
+            gate_args (tuple): The parameters of the gate
         """
 
-        if not classical_ctrl_gate:
-            self._check_errors(op=operation, len_qids=1, len_computing_host_ids=1)
-
-        q_id = operation["qids"][0]
-        qubit = self._get_stored_qubit(q_id)
-
-        if operation["gate"] == Operation.I:
-            qubit.I()
+        qubit = self._get_stored_qubit(operation["qids"][0])
+        gate(qubit, *gate_args)
 
-        elif operation["gate"] == Operation.X:
-            qubit.X()
-
-        elif operation["gate"] == Operation.Y:
-            qubit.Y()
-
-        elif operation["gate"] == Operation.Z:
-            qubit.Z()
-
-        elif operation["gate"] == Operation.T:
-            qubit.T()
-
-        elif operation["gate"] == Operation.H:
-            qubit.H()
-
-        elif operation["gate"] == Operation.K:
-            qubit.K()
-
-        elif operation["gate"] == Operation.RX:
-            qubit.rx(operation["gate_param"])
-
-        elif operation["gate"] == Operation.RY:
-            qubit.ry(operation["gate_param"])
-
-        elif operation["gate"] == Operation.RZ:
-            qubit.rz(operation["gate_param"])
-
-        elif operation["gate"] == Operation.CUSTOM:
-            gate_param = self.extract_gate_param(operation)
-            qubit.custom_gate(gate_param)
-
-    def _process_two_qubit_gates(self, operation: dict):
+    def _process_two_qubit_gates(
+        self, operation: dict, gate: Callable, gate_args: tuple
+    ):
         """
         Follows the operation command to perform two qubit gates on a qubit
 
         Args:
             operation (dict): Dictionary of information regarding the operation
+            gate (Callable): The qubit method which performs the gate
+            gate_args (tuple): The parameters of the gate
         """
 
-        self._check_errors(op=operation, len_qids=2, len_computing_host_ids=1)
-
         q_ids = operation["qids"]
         qubit_1 = self._get_stored_qubit(q_ids[0])
         qubit_2 = self._get_stored_qubit(q_ids[1])
 
-        if operation["gate"] == Operation.CNOT:
-            qubit_1.cnot(qubit_2)
-
-        elif operation["gate"] == Operation.CPHASE:
-            qubit_1.cphase(qubit_2)
-
-        elif operation["gate"] == Operation.CUSTOM_TWO_QUBIT:
-            gate_param = self.extract_gate_param(operation)
-            qubit_1.custom_two_qubit_gate(qubit_2, gate_param)
+        gate(qubit_1, qubit_2, *gate_args)
 
-        elif operation["gate"] == Operation.CUSTOM_CONTROLLED:
-            gate_param = self.extract_gate_param(operation)
-            qubit_1.custom_controlled_gate(qubit_2, gate_param)
-
-    def _process_classical_ctrl_gates(self, operation: dict):
+    def _process_classical_ctrl_gates(
+        self, operation: dict, gate: Callable, gate_args: tuple
+    ):
         """
         Follows the operation command to perform a classical control gate
         on a qubit.
 
         Args:
             operation (dict): Dictionary of information regarding the operation
+            gate (Callable): The qubit method which performs the gate
+            gate_args (tuple): The parameters of the gate
         """
 
-        self._check_errors(
-            op=operation, len_qids=1, len_computing_host_ids=1, len_cids=1
-        )
-
         control_bit_id = operation["cids"][0]
         bit = int(self._bits[control_bit_id])
 
         if bit:
-            self._process_single_gates(operation, classical_ctrl_gate=True)
+            self._process_single_gates(operation, gate, gate_args)
 
     def _process_send_ent(self, operation: dict):
         """
@@ -446,14 +893,18 @@ class ComputingHost(Host):
            operation (dict): Dictionary of information regarding the operation
         """
 
-        self._check_errors(op=operation, len_qids=1, len_computing_host_ids=2)
-
         qubit_id = operation["qids"][0]
         receiver_id = operation["computing_host_ids"][1]
 
-        self.send_epr(receiver_id, q_id=qubit_id, await_ack=True)
+        if self._take_pooled_epr_pair(receiver_id, qubit_id):
+            epr_qubit = self.get_epr(receiver_id, q_id=qubit_id, wait=self._epr_timeout)
+            if epr_qubit is None:
+                self._report_epr_timeout(receiver_id, qubit_id)
+                return
+        else:
+            self.send_epr(receiver_id, q_id=qubit_id, await_ack=True)
+            epr_qubit = self.get_epr(receiver_id, q_id=qubit_id)
 
-        epr_qubit = self.get_epr(receiver_id, q_id=qubit_id)
         self._add_new_qubit(epr_qubit, qubit_id, operation["pre_allocated_qubits"])
 
     def _process_rec_ent(self, operation: dict):
@@ -464,58 +915,211 @@ class ComputingHost(Host):
            operation (dict): Dictionary of information regarding the operation
         """
 
-        self._check_errors(op=operation, len_qids=1, len_computing_host_ids=2)
+        qubit_id = operation["qids"][0]
+        receiver_id = operation["computing_host_ids"][1]
+
+        # Blocks until the storage notifies the arrival of the EPR half
+        epr_qubit = self.get_epr(receiver_id, q_id=qubit_id, wait=self._epr_timeout)
+        if epr_qubit is None:
+            self._report_epr_timeout(receiver_id, qubit_id)
+            return
+
+        self._add_new_qubit(epr_qubit, qubit_id, operation["pre_allocated_qubits"])
+
+    async def _process_send_ent_async(self, operation: dict):
+        """
+        Follows the operation command to send EPR pair, without blocking the
+        event loop
+
+        Args:
+           operation (dict): Dictionary of information regarding the operation
+        """
 
         qubit_id = operation["qids"][0]
         receiver_id = operation["computing_host_ids"][1]
 
-        i = 0
-        epr_qubit = None
+        if not self._take_pooled_epr_pair(receiver_id, qubit_id):
+            self.send_epr(receiver_id, q_id=qubit_id)
 
-        while i < MAX_WAIT and epr_qubit is None:
-            epr_qubit = self.get_epr(receiver_id, q_id=qubit_id)
-            i += 1
-            time.sleep(0.5)
+        epr_qubit = await self._await_epr(receiver_id, qubit_id)
+        if epr_qubit is not None:
+            self._add_new_qubit(epr_qubit, qubit_id, operation["pre_allocated_qubits"])
 
-        self._add_new_qubit(epr_qubit, qubit_id, operation["pre_allocated_qubits"])
+    async def _process_rec_ent_async(self, operation: dict):
+        """
+        Follows the operation command to receive EPR pair, without blocking the
+        event loop
 
-    def _process_send_classical(self, operation: dict):
+        Args:
+           operation (dict): Dictionary of information regarding the operation
         """
-        Follows the operation command to receive a classical bit
+
+        qubit_id = operation["qids"][0]
+        receiver_id = operation["computing_host_ids"][1]
+
+        epr_qubit = await self._await_epr(receiver_id, qubit_id)
+        if epr_qubit is not None:
+            self._add_new_qubit(epr_qubit, qubit_id, operation["pre_allocated_qubits"])
+
+    def _fill_epr_pool(self):
+        """
+        Share the next EPR pairs of the schedule with every receiving computing
+        host in advance, until the pool of each link is full. The pairs are
+        generated without waiting for the acknowledgement, and the receivers
+        store them under the qubit IDs the schedule uses. This computing host
+        holds one half of every pooled pair, so the pairs of all the links are
+        bounded by its free pre-allocated qubits.
+        """
+
+        pooled_pairs = sum(len(pool) for pool in self._epr_pool.values())
+
+        for receiver_id, upcoming_pairs in self._upcoming_epr_pairs.items():
+            pool = self._epr_pool.setdefault(receiver_id, set())
+
+            while (
+                upcoming_pairs
+                and len(pool) < self._epr_pool_depth
+                and pooled_pairs < self._total_pre_allocated_qubits
+            ):
+                qubit_id = upcoming_pairs.popleft()
+                self.send_epr(receiver_id, q_id=qubit_id)
+                pool.add(qubit_id)
+                pooled_pairs += 1
+
+    def _take_pooled_epr_pair(self, receiver_id: str, qubit_id: str) -> bool:
+        """
+        Take an EPR pair out of the pool of the link with a receiving computing
+        host. A pair which is not in the pool is no longer counted as upcoming,
+        since the operation generates it.
 
         Args:
-            operation (dict): Dictionary of information regarding the operation
+            receiver_id (str): ID of the computing host receiving the EPR half
+            qubit_id (str): ID of the EPR qubit
+
+        Returns:
+            (bool): If the EPR pair was already shared in advance
         """
 
-        self._check_errors(op=operation, len_computing_host_ids=2, len_cids=1)
+        pool = self._epr_pool.get(receiver_id, set())
+        if qubit_id in pool:
+            pool.remove(qubit_id)
+            return True
+
+        upcoming_pairs = self._upcoming_epr_pairs.get(receiver_id)
+        if upcoming_pairs and qubit_id in upcoming_pairs:
+            upcoming_pairs.remove(qubit_id)
+        return False
+
+    async def _await_epr(self, host_id: str, qubit_id: str) -> Optional[Qubit]:
+        """
+        Await the EPR half shared with another computing host. If it does not
+        arrive in time, the error is reported.
+
+        Args:
+            host_id (str): ID of the computing host sharing the EPR pair
+            qubit_id (str): ID of the EPR qubit
+
+        Returns:
+            (Qubit): The EPR qubit, or None if it did not arrive in time
+        """
+
+        deadline = time.monotonic() + self._epr_timeout
+        epr_qubit = self.get_epr(host_id, q_id=qubit_id)
+
+        while epr_qubit is None:
+            if time.monotonic() >= deadline:
+                self._report_epr_timeout(host_id, qubit_id)
+                return None
+
+            await asyncio.sleep(Constants.ASYNC_POLL_INTERVAL)
+            epr_qubit = self.get_epr(host_id, q_id=qubit_id)
+
+        return epr_qubit
+
+    def _report_epr_timeout(self, host_id: str, qubit_id: str):
+        """
+        Report that the EPR half shared with another computing host did not
+        arrive in time
+
+        Args:
+            host_id (str): ID of the computing host sharing the EPR pair
+            qubit_id (str): ID of the EPR qubit
+        """
+
+        msg = "EPR qubit {0} shared with {1} did not arrive within {2} seconds".format(
+            qubit_id, host_id, self._epr_timeout
+        )
+        self._report_error(msg)
+
+    def _process_send_classical(self, operation: dict, await_ack: bool = True):
+        """
+        Follows the operation command to send a classical bit
+
+        Args:
+            operation (dict): Dictionary of information regarding the operation
+            await_ack (bool): If the computing host should wait for the receiver
+                to acknowledge the bit
+        """
 
         bit_id = operation["cids"][0]
 
         if bit_id not in self._bits.keys():
             msg = "Bit not present in the computing host"
             self._report_error(msg)
+            return
 
         receiver_id = operation["computing_host_ids"][1]
 
-        self.send_classical(receiver_id, self._bits[bit_id], await_ack=True)
+        self.send_classical(receiver_id, self._bits[bit_id], await_ack=await_ack)
 
-    def _process_rec_classical(self, operation: dict):
+    def _process_rec_classical(self, operation: dict, msg: Optional[Message] = None):
         """
         Follows the operation command to receive a classical bit
 
         Args:
             operation (dict): Dictionary of information regarding the operation
+            msg (Message): The message with the bit, if it was already received.
+                Otherwise the computing host waits for it
         """
 
-        self._check_errors(op=operation, len_computing_host_ids=2, len_cids=1)
+        if msg is None:
+            sender_id = operation["computing_host_ids"][1]
+            msg = self.get_next_classical(sender_id, wait=-1)
 
-        sender_id = operation["computing_host_ids"][1]
-        msg = self.get_next_classical(sender_id, wait=-1)
         bit = msg.content
         bit_id = operation["cids"][0]
 
         self._bits[bit_id] = bit
 
+    async def _process_send_classical_async(self, operation: dict):
+        """
+        Follows the operation command to send a classical bit, without waiting
+        for the receiver to acknowledge it
+
+        Args:
+            operation (dict): Dictionary of information regarding the operation
+        """
+
+        self._process_send_classical(operation, await_ack=False)
+
+    async def _process_rec_classical_async(self, operation: dict):
+        """
+        Follows the operation command to receive a classical bit, without
+        blocking the event loop while the bit has not arrived
+
+        Args:
+            operation (dict): Dictionary of information regarding the operation
+        """
+
+        sender_id = operation["computing_host_ids"][1]
+
+        msg = self.get_next_classical(sender_id, wait=0)
+        while msg is None:
+            await asyncio.sleep(Constants.ASYNC_POLL_INTERVAL)
+            msg = self.get_next_classical(sender_id, wait=0)
+
+        self._process_rec_classical(operation, msg)
+
     def _process_measurement(self, operation: dict):
         """
         Follows the operation command to measure a qubit and save the result
@@ -524,10 +1128,6 @@ class ComputingHost(Host):
             operation (dict): Dictionary of information regarding the operation
         """
 
-        self._check_errors(
-            op=operation, len_qids=1, len_computing_host_ids=1, len_cids=1
-        )
-
         qubit_id = operation["qids"][0]
         bit_id = operation["cids"][0]
 
@@ -536,6 +1136,21 @@ class ComputingHost(Host):
         bit = qubit.measure(non_destructive=False)
         self._bits[bit_id] = bit
 
+        if self._stream_measurements and not self._is_internal_bit(bit_id):
+            record = json.dumps([self._completed_shots, self._clock.ticks, bit_id, bit])
+            self.send_classical(self._controller_host_id, record)
+            self._streamed_records += 1
+
+        self._remove_measured_qubit(qubit_id)
+
+    def _remove_measured_qubit(self, qubit_id: str):
+        """
+        Remove a measured qubit from its register
+
+        Args:
+            qubit_id (str): ID of the measured qubit
+        """
+
         if qubit_id in self._pre_allocated_qubits:
             del self._pre_allocated_qubits[qubit_id]
             self._total_pre_allocated_qubits += 1
@@ -543,19 +1158,117 @@ class ComputingHost(Host):
             del self._qubits[qubit_id]
             self._total_qubits -= 1
 
-    def _process_rec_hamilton(self, operation: dict):
+    def _process_sample(self, operation: dict):
         """
-        Receives a list of observables from the controller to calculate their expectation values
+        Follows the operation command to sample a terminal measurement. The qubit
+        is left unmeasured until the end of the schedule, when the bits of all
+        the shots are drawn from the final state at once.
 
         Args:
             operation (dict): Dictionary of information regarding the operation
         """
 
-        self._check_errors(op=operation, len_computing_host_ids=1)
+        qubit_id = operation["qids"][0]
+        bit_id = operation["cids"][0]
+
+        self._sampled_qubits[bit_id] = (self._get_stored_qubit(qubit_id), self._clock.ticks)
+        self._sample_shots = operation["shots"]
+        self._sample_seed = operation["seed"]
+
+        self._remove_measured_qubit(qubit_id)
+
+    def _sample_measurements(self):
+        """
+        Draw the bits of every shot of the SAMPLE operations from the final
+        state of the qubits, in one draw for every group of entangled qubits.
+        The computing hosts sharing a group draw from the same seed, so the
+        bits of the different computing hosts stay correlated shot by shot.
+        """
+
+        if not self._sampled_qubits or self._error_message is not None:
+            return
+
+        shots = self._sample_shots
+        bit_ids = sorted(self._sampled_qubits)
+        samples = np.zeros((shots, len(bit_ids)), dtype=int)
+
+        pending_bits = {
+            bit_id: qubit for bit_id, (qubit, _) in self._sampled_qubits.items()
+        }
+        while pending_bits:
+            qubit = next(iter(pending_bits.values()))
+            group_ids, statevector = self.backend.statevector(qubit)
+
+            probabilities = np.abs(np.asarray(statevector)) ** 2
+            group_key = zlib.crc32(",".join(sorted(group_ids)).encode())
+            rng = np.random.default_rng([self._sample_seed, group_key])
+            indices = rng.choice(
+                len(probabilities), size=shots, p=probabilities / probabilities.sum()
+            )
+
+            # The first qubit of the group is the most significant bit
+            for bit_id, qubit in list(pending_bits.items()):
+                if qubit.qubit in group_ids:
+                    shift = len(group_ids) - 1 - group_ids.index(qubit.qubit)
+                    samples[:, bit_ids.index(bit_id)] = (indices >> shift) & 1
+                    del pending_bits[bit_id]
+
+        self._memory = ["".join(map(str, row)) for row in samples.tolist()]
+        bitstrings, counts = np.unique(self._memory, return_counts=True)
+        self._counts = dict(zip(bitstrings.tolist(), counts.tolist()))
+
+        ones = samples.sum(axis=0).tolist()
+        self._bit_counts = {
+            bit_id: {"0": shots - ones[i], "1": ones[i]} for i, bit_id in enumerate(bit_ids)
+        }
+        self._completed_shots = shots
+
+        if self._stream_measurements:
+            self._stream_samples(bit_ids, samples)
+
+    def _stream_samples(self, bit_ids: List[str], samples: np.ndarray):
+        """
+        Send the sampled bits of every shot to the controller host, as the
+        records of the measurements they replace
+
+        Args:
+            bit_ids (list): The IDs of the sampled classical bits
+            samples (np.ndarray): The sampled bits, with one row per shot
+        """
+
+        for shot, row in enumerate(samples.tolist()):
+            for bit_id, bit in zip(bit_ids, row):
+                _, ticks = self._sampled_qubits[bit_id]
+                record = json.dumps([shot, ticks, bit_id, bit])
+                self.send_classical(self._controller_host_id, record)
+                self._streamed_records += 1
 
-        self._hamiltonian = operation["hamiltonian"]
+    def _release_sampled_qubits(self):
+        """
+        Measure the qubits left unmeasured by the SAMPLE operations of the last
+        schedule. They are only released once the next schedule arrives, since the
+        other computing hosts may still be sampling from the same state before.
+        """
+
+        for qubit, _ in self._sampled_qubits.values():
+            qubit.measure(non_destructive=False)
+        self._sampled_qubits = {}
 
-        self._calculated_exp = False
+    def _process_rec_hamilton(self, operation: dict):
+        """
+        Receives a list of observables from the controller to calculate their expectation values.
+        The observables are compiled once, when they are received.
+
+        Args:
+            operation (dict): Dictionary of information regarding the operation
+        """
+
+        hamiltonian = operation["hamiltonian"]
+        if not isinstance(hamiltonian, CompiledHamiltonian):
+            hamiltonian = CompiledHamiltonian(hamiltonian)
+        self._hamiltonian = hamiltonian
+
+        self._exp_calculated.clear()
 
         return
 
@@ -567,20 +1280,56 @@ class ComputingHost(Host):
             operation (dict): Dictionary of information regarding the operation
         """
 
-        self._check_errors(op=operation, len_computing_host_ids=1)
+        self.exp = self._hamiltonian.expectation_value(self._statevector())
+
+        self._exp_calculated.set()
+
+        return
+
+    def _statevector(self) -> np.ndarray:
+        """
+        Get the statevector of the qubits of the computing host
+
+        Returns:
+            (np.ndarray): The statevector of the qubits
+        """
 
         indices = []
 
         for qubit_id in self.qubit_ids:
             indices.append(self.get_qubit_by_id(qubit_id))
 
-        statevector = self.backend.statevector(indices[0])[1]
+        return self.backend.statevector(indices[0])[1]
+
+    def serve_expectation_terms(self):
+        """
+        Evaluate the chunks of Hamiltonian terms which the controller host
+        dispatches, on the final state of the qubits once the clock stops. Every
+        chunk is answered with its expectation value, or with an error if its
+        terms cannot be evaluated on the qubits, so the controller host sends the
+        next chunk to the computing host which is free first, until it has no
+        more chunks.
+        """
 
-        self.exp = expectation_value(self._hamiltonian, statevector, self._total_qubits)
+        self._clock.wait_until_stopped()
 
-        self._calculated_exp = True
+        while True:
+            msg = self.get_next_classical(self._controller_host_id, wait=-1)
+            if msg.content == "ACK":
+                continue
 
-        return
+            content = json.loads(msg.content)
+            if content["type"] == "expectation_done":
+                return
+
+            hamiltonian = CompiledHamiltonian(content["terms"])
+            try:
+                exp = hamiltonian.expectation_value(self._statevector())
+            except ValueError as error:
+                reply = {"type": "error", "chunk": content["chunk"], "message": str(error)}
+            else:
+                reply = {"type": "expectation_value", "chunk": content["chunk"], "val": np.real(exp)}
+            self.send_classical(self._controller_host_id, json.dumps(reply))
 
     def perform_schedule(self, ticks: int):
         """
@@ -592,63 +1341,152 @@ class ComputingHost(Host):
         """
 
         if ticks not in self._schedule:
+            # No work in this tick, so the time is used to share EPR pairs
+            self._fill_epr_pool()
             self._clock.respond()
             return
 
-        for operation in self._schedule[ticks]:
-            if operation["name"] == Constants.PREPARE_QUBITS:
-                self._prepare_qubits(operation)
+        # The EPR pairs are only shared in advance once the clock runs, when
+        # every computing host has accepted its schedule
+        if not self._epr_pool:
+            self._fill_epr_pool()
 
-            if operation["name"] == Constants.SINGLE:
-                self._process_single_gates(operation)
+        for handler, _, args in self._schedule[ticks]:
+            handler(*args)
 
-            if operation["name"] == Constants.TWO_QUBIT:
-                self._process_two_qubit_gates(operation)
+        self._clock.respond()
+
+    async def perform_schedule_async(self, ticks: int):
+        """
+        Process the schedule and perform the corresponding operations accordingly,
+        for the coroutine based execution engine. The operations which wait on
+        another computing host yield to the event loop instead of blocking.
 
-            if operation["name"] == Constants.CLASSICAL_CTRL_GATE:
-                self._process_classical_ctrl_gates(operation)
+        Args:
+           ticks (int): Number of times the clock has ticked
+        """
 
-            if operation["name"] == Constants.SEND_ENT:
-                self._process_send_ent(operation)
+        if ticks not in self._schedule:
+            self._fill_epr_pool()
+            return
 
-            if operation["name"] == Constants.REC_ENT:
-                self._process_rec_ent(operation)
+        if not self._epr_pool:
+            self._fill_epr_pool()
 
-            if operation["name"] == Constants.SEND_CLASSICAL:
-                self._process_send_classical(operation)
+        for handler, async_handler, args in self._schedule[ticks]:
+            if async_handler is None:
+                handler(*args)
+            else:
+                await async_handler(*args)
 
-            if operation["name"] == Constants.REC_CLASSICAL:
-                self._process_rec_classical(operation)
+    def complete_shot(self, last_shot: bool = False):
+        """
+        Record the classical bits measured in the shot which just ended, and reset
+        the qubit registers so that the schedule can be performed again for the
+        next shot. Called by the clock after every shot of a multi-shot run.
 
-            if operation["name"] == Constants.MEASURE:
-                self._process_measurement(operation)
+        Args:
+            last_shot (bool): If no shot follows, so that no EPR pairs are shared
+                in advance for it
+        """
 
-            if operation["name"] == Constants.REC_HAMILTON:
-                self._process_rec_hamilton(operation)
+        bits = self.bits
+        for bit_id, bit in bits.items():
+            bit_counts = self._bit_counts.setdefault(bit_id, {"0": 0, "1": 0})
+            bit_counts[str(int(bit))] += 1
 
-            if operation["name"] == Constants.SEND_EXP:
-                self._process_send_exp(operation)
+        bitstring = "".join(str(int(bits[bit_id])) for bit_id in sorted(bits))
+        self._memory.append(bitstring)
+        self._counts[bitstring] = self._counts.get(bitstring, 0) + 1
+        self._completed_shots += 1
 
-        self._clock.respond()
+        self._reset_registers()
 
-    def send_results(self, result_type: str = "bits"):
+        # The EPR pairs of the next shot are shared in advance again
+        self._reset_upcoming_epr_pairs()
+        if not last_shot:
+            self._fill_epr_pool()
+
+    def _reset_registers(self):
+        """
+        Measure the qubits which are left over at the end of a shot, release the
+        data qubits of the shot and restore the register sizes of the schedule
         """
-        Send results to Controller Host
+
+        for qubit in list(self._qubits.values()) + list(
+            self._pre_allocated_qubits.values()
+        ):
+            qubit.measure(non_destructive=False)
+
+        for qubit_id in self._prepared_qubit_ids:
+            self.get_data_qubit(self.host_id, q_id=qubit_id)
+
+        self._qubits = {}
+        self._pre_allocated_qubits = {}
+        self._bits = {}
+        self._prepared_qubit_ids = []
+        self._total_qubits, self._total_pre_allocated_qubits = self._register_sizes
+
+    def _wait_for_results(self, result_type: str):
         """
+        Block until the clock notifies that it stopped ticking, so the results
+        are sent the moment the last tick finishes
 
-        # TODO: Check if there is a better implementation
-        # Wait for the clock to stop ticking to send the results
-        while not self._clock.has_stopped:
-            time.sleep(1)
+        Args:
+            result_type (str): The type of results to send, either 'bits' or
+                'expectation'
+        """
 
-        # Wait until the expectation calculation is finished
-        while result_type == "expectation" and not self._calculated_exp:
-            time.sleep(0.5)
+        self._clock.wait_until_stopped()
+        self._sample_measurements()
+        self._check_results(result_type)
+
+    def _check_results(self, result_type: str):
+        """
+        Check that the results are complete once the clock has stopped. Every
+        tick is performed before the clock stops, so an expectation value which
+        has not been calculated by then is reported as an error instead of being
+        waited on.
+
+        Args:
+            result_type (str): The type of results to send, either 'bits' or
+                'expectation'
+        """
+
+        if (
+            result_type == "expectation"
+            and self._error_message is None
+            and not self._exp_calculated.is_set()
+        ):
+            self._error_message = (
+                "The expectation value was not calculated before the clock stopped"
+            )
+
+    def _get_results_message(self, result_type: str) -> str:
+        """
+        Build the message with the results for the Controller Host
+
+        Args:
+            result_type (str): The type of results to send, either 'bits' or
+                'expectation'
+
+        Returns:
+            (str): The JSON encoded results message
+        """
 
         if self._error_message:
             msg = {"type": "error", "message": self._error_message}
         else:
-            if result_type == "bits":
+            if result_type == "bits" and self._completed_shots > 0:
+                msg = {
+                    "type": "measurement_counts",
+                    "shots": self._completed_shots,
+                    "val": self._bit_counts,
+                    "counts": self._counts,
+                    "bit_ids": sorted(self._bit_counts),
+                    "memory": self._memory,
+                }
+            elif result_type == "bits":
                 msg = {"type": "measurement_result", "val": self.bits}
             elif result_type == "expectation":
                 msg = {"type": "expectation_value", "val": np.real(self.exp)}
@@ -658,5 +1496,39 @@ class ComputingHost(Host):
                     "message": "Supported result types are only 'bits' and 'expectation'",
                 }
 
-        message = json.dumps({self.host_id: msg})
+        # The records may arrive after the results, so the controller host is
+        # told how many to wait for
+        if self._stream_measurements:
+            msg["streamed_records"] = self._streamed_records
+
+        return json.dumps({self.host_id: msg})
+
+    def send_results(self, result_type: str = "bits"):
+        """
+        Send results to Controller Host, as soon as the clock stops ticking
+
+        Args:
+            result_type (str): The type of results to send, either 'bits' or
+                'expectation'
+        """
+
+        self._wait_for_results(result_type)
+
+        message = self._get_results_message(result_type)
         self.send_classical(self._controller_host_id, message, await_ack=True)
+
+    async def send_results_async(self, result_type: str = "bits"):
+        """
+        Send results to Controller Host, for the coroutine based execution engine
+
+        Args:
+            result_type (str): The type of results to send, either 'bits' or
+                'expectation'
+        """
+
+        await self._clock.wait_until_stopped_async()
+        self._sample_measurements()
+        self._check_results(result_type)
+
+        message = self._get_results_message(result_type)
+        self.send_classical(self._controller_host_id, message)
@@ -1,16 +1,25 @@
 from qunetsim.components import Host
+from qunetsim.objects import DaemonThread, Message
 
 from .computing_host import ComputingHost
+from .async_clock import AsyncClock
 from .clock import Clock
+from .vqe_session import VQESession
 from ..utils import DefaultOperationTime
 from ..utils.constants import Constants
-from ..objects import Operation, Circuit, Layer
-
+from ..utils.vqe_subroutines import CompiledHamiltonian
+from ..objects import Operation, Circuit, Layer, Parameter
+
+import asyncio
+import queue
+from collections import OrderedDict
+import threading
+import time
 import numpy as np
 import uuid
 import json
 
-from typing import List, Optional, Dict, Tuple
+from typing import Callable, Iterator, List, Optional, Dict, Tuple, Union
 
 
 class ControllerHost(Host):
@@ -25,6 +34,7 @@ class ControllerHost(Host):
         computing_host_ids: Optional[List[str]] = None,
         gate_time: Optional[Dict[str, int]] = None,
         backend: Optional = None,
+        clock: Optional[Clock] = None,
     ):
         """
         Returns the important things for the controller hosts
@@ -35,6 +45,8 @@ class ControllerHost(Host):
             gate_time (dict): A mapping of gate names to time the gate takes
                to execute for each computing host
             backend (Backend): Backend for qubits
+            clock (Clock): Clock which synchronises the computing hosts of this
+               controller host. The default clock is used if none is given
         """
         super().__init__(host_id, backend=backend)
 
@@ -43,7 +55,7 @@ class ControllerHost(Host):
             computing_host_ids if computing_host_ids is not None else []
         )
         self.add_c_connections(self._computing_host_ids)
-        self._clock = Clock.get_instance()
+        self._clock = clock if clock is not None else Clock.get_instance()
         self._circuit_max_execution_time = 0
 
         # TODO: Take gate_time as an input from computing hosts
@@ -54,8 +66,26 @@ class ControllerHost(Host):
 
         self._gate_time = gate_time
         self._results = None
+
+        # Fraction of the last dispatch of expectation terms which every
+        # computing host spent evaluating terms
+        self._host_utilisation = {}
         self._backend = backend
 
+        # Number of pre-allocated qubits of each computing host, which bounds
+        # how early the EPR pairs can be generated
+        self._pre_allocated_qubits = {}
+        self._makespan_reduction = 0
+
+        # Set once the computing hosts replied to their schedules, so that the
+        # results are only read after the replies
+        self._schedules_delivered = threading.Event()
+
+        # Compiled schedules of the parametric circuits, keyed by the structure
+        # of the circuit, and the key of the schedules the computing hosts hold
+        self._schedule_cache = OrderedDict()
+        self._delivered_schedule_key = None
+
     @property
     def computing_host_ids(self):
         """
@@ -65,6 +95,15 @@ class ControllerHost(Host):
         """
         return self._computing_host_ids
 
+    @property
+    def clock(self):
+        """
+        Get the clock which synchronises the computing hosts
+        Returns:
+            (Clock): The clock of the controller host
+        """
+        return self._clock
+
     @property
     def results(self):
         """
@@ -75,8 +114,92 @@ class ControllerHost(Host):
         """
         return self._results
 
+    @property
+    def host_utilisation(self):
+        """
+        Get the fraction of the last dispatch of expectation terms which every
+        computing host spent evaluating its chunks
+        Returns:
+            (dict): The utilisation of every computing host, between 0 and 1
+        """
+        return self._host_utilisation
+
+    @property
+    def counts(self):
+        """
+        Get the counts of the bitstrings measured over the shots of a multi-shot
+        run, joined across all the computing hosts shot by shot. The bits of the
+        bitstrings are ordered as in *count_bit_ids*.
+        Returns:
+            (dict): A mapping of the bitstrings to the number of shots in which
+                they were measured
+        """
+        memories = [result["memory"] for result in self._shot_results()]
+        if not memories:
+            return {}
+
+        counts = {}
+        for bitstring in map("".join, zip(*memories)):
+            counts[bitstring] = counts.get(bitstring, 0) + 1
+        return counts
+
+    @property
+    def count_bit_ids(self):
+        """
+        Get the classical bit IDs of the bitstrings in *counts*
+        Returns:
+            (list): The classical bit IDs, in the order of the bits
+        """
+        bit_ids = []
+        for result in self._shot_results():
+            bit_ids.extend(result["bit_ids"])
+        return bit_ids
+
+    @property
+    def bit_counts(self):
+        """
+        Get the counts of every classical bit over the shots of a multi-shot run,
+        aggregated from the results of all the computing hosts
+        Returns:
+            (dict): A mapping of the classical bit IDs to the number of shots in
+                which they were measured as '0' and as '1'
+        """
+        bit_counts = {}
+        for result in self._shot_results():
+            bit_counts.update(result["val"])
+        return bit_counts
+
+    def _shot_results(self) -> List[dict]:
+        """
+        Get the results of a multi-shot run, in the order of the computing hosts
+
+        Returns:
+            (list): The measurement counts sent by every computing host
+        """
+        results = self._results or {}
+        return [
+            results[host_id]
+            for host_id in self._computing_host_ids
+            if results.get(host_id, {}).get("type") == "measurement_counts"
+        ]
+
+    @property
+    def makespan_reduction(self):
+        """
+        Get the number of ticks by which moving the EPR pair generation earlier
+        shortened the last distributed schedule
+        Returns:
+            (int): The makespan reduction in ticks
+        """
+        return self._makespan_reduction
+
     def create_distributed_network(
-        self, num_computing_hosts: int, num_qubits_per_host: int
+        self,
+        num_computing_hosts: int,
+        num_qubits_per_host: int,
+        id_prefix: str = "QPU_",
+        epr_pool_depth: int = Constants.EPR_POOL_DEPTH,
+        stream_measurements: bool = False,
     ) -> Tuple[List[ComputingHost], Dict[str, List[str]]]:
         """
         Create a network of *num_computing_hosts* completely connected computing nodes with
@@ -85,11 +208,16 @@ class ControllerHost(Host):
         Args:
             num_computing_hosts (int): The number of computing hosts to initialize
             num_qubits_per_host (int): The number of qubits on each computing host
+            id_prefix (str): Prefix of the computing host IDs. Simulations sharing
+                the same QuNetSim network need distinct prefixes
+            epr_pool_depth (int): The number of EPR pairs each computing host
+                shares in advance with every other computing host
+            stream_measurements (bool): If the computing hosts stream their
+                measurement records to the controller host as they are performed
         Returns:
             (tuple): The list of computing hosts and the qubit map for their qubits
         """
 
-        id_prefix = "QPU_"
         computing_hosts = []
         q_map = {}
         self._computing_host_ids = [
@@ -103,8 +231,12 @@ class ControllerHost(Host):
                 total_qubits=num_qubits_per_host,
                 total_pre_allocated_qubits=num_qubits_per_host,
                 backend=self._backend,
+                clock=self._clock,
+                epr_pool_depth=epr_pool_depth,
+                stream_measurements=stream_measurements,
             )
             self._gate_time[id_prefix + str(i)] = DefaultOperationTime
+            self._pre_allocated_qubits[id_prefix + str(i)] = num_qubits_per_host
             self.add_c_connection(id_prefix + str(i))
             computing_hosts.append(computing_host)
             q_map[computing_host.host_id] = [
@@ -119,7 +251,12 @@ class ControllerHost(Host):
 
         return computing_hosts, q_map
 
-    def connect_host(self, computing_host_id: str, gate_time: Dict[str, int] = None):
+    def connect_host(
+        self,
+        computing_host_id: str,
+        gate_time: Dict[str, int] = None,
+        total_pre_allocated_qubits: int = Constants.DEFAULT_PRE_ALLOCATED_QUBITS,
+    ):
         """
         Adds a computing host to the distributed network
 
@@ -127,12 +264,19 @@ class ControllerHost(Host):
             computing_host_id (str): The ID of the computing host
             gate_time (dict): A mapping of gate names to time the gate
                 takes to execute for the computing host to be added
+            total_pre_allocated_qubits (int): Total number of pre allocated qubits
+                possessed by the computing host to be added
         """
 
-        self.connect_hosts([computing_host_id], [gate_time])
+        self.connect_hosts(
+            [computing_host_id], [gate_time], [total_pre_allocated_qubits]
+        )
 
     def connect_hosts(
-        self, computing_host_ids: List[str], gate_times: List[Dict[str, int]] = None
+        self,
+        computing_host_ids: List[str],
+        gate_times: List[Dict[str, int]] = None,
+        total_pre_allocated_qubits: List[int] = None,
     ):
         """
         Adds multiple computing hosts to the distributed network
@@ -141,12 +285,17 @@ class ControllerHost(Host):
             computing_host_ids (list): The ID of the computing host
             gate_times (list): A list of mappings of gate names to time the gate
                 takes to execute for the computing host to be added
+            total_pre_allocated_qubits (list): A list of the total number of pre
+                allocated qubits possessed by the computing hosts to be added
         """
 
         for i, computing_host_id in enumerate(computing_host_ids):
             self._computing_host_ids.append(computing_host_id)
             self.add_c_connection(computing_host_id)
 
+            if total_pre_allocated_qubits is not None:
+                self._pre_allocated_qubits[computing_host_id] = total_pre_allocated_qubits[i]
+
             if gate_times is None or len(gate_times) == 0 or gate_times[i] is None:
                 gate_time = DefaultOperationTime
             else:
@@ -156,48 +305,178 @@ class ControllerHost(Host):
 
     def _create_distributed_schedules(self, circuit: Circuit):
         """
-        Creates a distributed schedule for each of the computing host
+        Creates a distributed schedule for each of the computing host. The EPR
+        pairs are generated as early as the pre-allocated qubits of the computing
+        hosts allow.
 
         Args:
             circuit (Circuit): The Circuit object which contains
                 information regarding a quantum circuit
+
+        Returns:
+            (tuple): The schedules of the computing hosts, the tick at which the
+                schedules end and the number of ticks saved by generating the
+                EPR pairs earlier
         """
 
         time_layer_end = self._clock.ticks
         operation_schedule = []
 
-        layers = circuit.layers
+        layers = self._hoist_epr_pairs(circuit.layers)
+
+        makespan_reduction = sum(
+            self._get_layer_execution_time(layer) for layer in circuit.layers
+        ) - sum(self._get_layer_execution_time(layer) for layer in layers)
 
         # We form an intermediate schedule which is used before splitting
         # the schedules for each computing host
         for layer in layers:
-            max_execution_time = 0
-
             for operation in layer.operations:
                 op = operation.get_dict()
                 op["layer_end"] = time_layer_end
 
                 operation_schedule.append(op)
 
-                # Find the maximum time taken to execute this layer
-                execution_time = self._get_operation_execution_time(
-                    op["computing_host_ids"][0], operation.name, operation.gate
+            time_layer_end += self._get_layer_execution_time(layer)
+
+        computing_host_schedules = {
+            computing_host_id: [] for computing_host_id in self._computing_host_ids
+        }
+
+        for op in operation_schedule:
+            computing_host_id = op["computing_host_ids"][0]
+            if computing_host_id in computing_host_schedules:
+                computing_host_schedules[computing_host_id].append(op)
+
+        return computing_host_schedules, time_layer_end, makespan_reduction
+
+    def _get_layer_execution_time(self, layer: Layer) -> float:
+        """
+        Return the time taken to execute a layer, which is the maximum execution
+        time of its operations
+
+        Args:
+            layer (Layer): The layer of the distributed circuit
+
+        Returns:
+            (float): The layer execution time
+        """
+
+        max_execution_time = 0
+        for operation in layer.operations:
+            execution_time = self._get_operation_execution_time(
+                operation.computing_host_ids[0], operation.name, operation.gate
+            )
+            max_execution_time = max(max_execution_time, execution_time)
+
+        return max_execution_time
+
+    def _hoist_epr_pairs(self, layers: List[Layer]) -> List[Layer]:
+        """
+        Move the generation of every EPR pair to the earliest layer where it
+        overlaps with the local operations of the computing hosts, without
+        lengthening that layer. A computing host holds the EPR half in one of its
+        pre-allocated qubits until the half is measured, so the pair is only moved
+        while both computing hosts have a pre-allocated qubit free. The layers
+        left empty are removed.
+
+        Args:
+            layers (list): The layers of the distributed circuit
+
+        Returns:
+            (list): The new layers of the distributed circuit
+        """
+
+        layers = [Layer(list(layer.operations)) for layer in layers]
+
+        # Operations generating every EPR pair, and the layer in which each of
+        # the computing hosts measures its half of the pair
+        epr_operations = {}
+        release_layers = {}
+
+        for index, layer in enumerate(layers):
+            for operation in layer.operations:
+                if operation.name in (Constants.SEND_ENT, Constants.REC_ENT):
+                    epr_operations.setdefault(operation.qids[0], []).append(
+                        (index, operation)
+                    )
+                elif operation.name == Constants.MEASURE:
+                    key = (operation.computing_host_ids[0], operation.qids[0])
+                    release_layers[key] = index
+
+        # Number of EPR halves held by every computing host in every layer
+        held_qubits = {}
+        for qubit_id, operations in epr_operations.items():
+            for index, operation in operations:
+                computing_host_id = operation.computing_host_ids[0]
+                release_layer = release_layers.get(
+                    (computing_host_id, qubit_id), len(layers) - 1
                 )
-                max_execution_time = max(max_execution_time, execution_time)
+                held = held_qubits.setdefault(computing_host_id, [0] * len(layers))
+                for layer_index in range(index, release_layer + 1):
+                    held[layer_index] += 1
+
+        for qubit_id, operations in epr_operations.items():
+            # A pair whose operations are spread over several layers stays
+            # where the circuit put it
+            index = operations[0][0]
+            if any(op_index != index for op_index, _ in operations):
+                continue
+
+            computing_host_ids = [op.computing_host_ids[0] for _, op in operations]
+            execution_time = max(
+                self._get_operation_execution_time(op.computing_host_ids[0], op.name, None)
+                for _, op in operations
+            )
+
+            target_index = index
+            for layer_index in range(index - 1, -1, -1):
+                qubit_free = all(
+                    held_qubits[computing_host_id][layer_index]
+                    < self._pre_allocated_qubits.get(
+                        computing_host_id, Constants.DEFAULT_PRE_ALLOCATED_QUBITS
+                    )
+                    for computing_host_id in computing_host_ids
+                )
+                if not qubit_free:
+                    break
 
-            time_layer_end += max_execution_time
+                if self._get_layer_execution_time(layers[layer_index]) >= execution_time:
+                    target_index = layer_index
 
-        computing_host_schedules = {}
+            if target_index == index:
+                continue
 
-        for computing_host_id in self._computing_host_ids:
-            computing_host_schedule = []
+            for _, operation in operations:
+                layers[index].operations.remove(operation)
+                layers[target_index].add_operation(operation)
 
-            for op in operation_schedule:
-                if op["computing_host_ids"][0] == computing_host_id:
-                    computing_host_schedule.append(op)
-            computing_host_schedules[computing_host_id] = computing_host_schedule
+            for computing_host_id in computing_host_ids:
+                for layer_index in range(target_index, index):
+                    held_qubits[computing_host_id][layer_index] += 1
 
-        return computing_host_schedules, time_layer_end
+        return [layer for layer in layers if layer.operations]
+
+    @staticmethod
+    def _get_event_ticks(computing_host_schedules: Dict[str, List[dict]]) -> List[int]:
+        """
+        Get the sorted ticks at which at least one computing host has an
+        operation scheduled
+
+        Args:
+            computing_host_schedules (dict): A mapping of the computing host IDs
+                to their schedules
+
+        Returns:
+            (list): The sorted list of ticks with scheduled operations
+        """
+
+        event_ticks = set()
+        for schedule in computing_host_schedules.values():
+            for op in schedule:
+                event_ticks.add(op["layer_end"])
+
+        return sorted(event_ticks)
 
     @staticmethod
     def _replace_control_gates(control_gate_info: list, current_layer: Layer):
@@ -418,14 +697,107 @@ class ControllerHost(Host):
 
         return execution_time
 
-    def generate_and_send_schedules(self, circuit: Circuit):
+    def _send_schedules(
+        self,
+        circuit: Circuit,
+        shots: int = 1,
+        parameters: Optional[Dict[str, float]] = None,
+    ):
         """
-        Generate and send distributed schedules to all the computing hosts
-        associated to the circuit
+        Generate the distributed schedules, initialise the clock for them and
+        send every computing host associated to the circuit its own schedule. The
+        schedules of a parametric circuit are generated once for its structure,
+        and if the computing hosts already hold them, only the values of the
+        parameters are sent.
+
+        Args:
+            circuit (Circuit): The Circuit object which contains information
+                regarding a quantum circuit
+            shots (int): Number of times the schedules are performed
+            parameters (dict): The values of the symbolic parameters of the circuit
+        """
+
+        self._schedules_delivered.clear()
+
+        values = self._parameter_values(circuit, parameters)
+        key = self._schedule_key(circuit, shots) if values else None
+
+        # The schedules are laid out from the tick the clock is at, so cached
+        # schedules are moved along to the tick of this run
+        offset = 0
+        if key in self._schedule_cache:
+            self._schedule_cache.move_to_end(key)
+            cached = self._schedule_cache[key]
+            offset = self._clock.ticks - cached["start_tick"]
+            if offset:
+                self._shift_schedules(cached, offset)
+
+            computing_host_schedules = cached["schedules"]
+            event_ticks = cached["event_ticks"]
+            clock_shots = cached["shots"]
+            self._circuit_max_execution_time = cached["max_execution_time"]
+            self._makespan_reduction = cached["makespan_reduction"]
+        else:
+            start_tick = self._clock.ticks
+            computing_host_schedules, event_ticks, clock_shots = self._compile_schedules(
+                circuit, shots
+            )
+            if key is not None:
+                self._schedule_cache[key] = {
+                    "schedules": computing_host_schedules,
+                    "event_ticks": event_ticks,
+                    "shots": clock_shots,
+                    "start_tick": start_tick,
+                    "max_execution_time": self._circuit_max_execution_time,
+                    "makespan_reduction": self._makespan_reduction,
+                }
+                while len(self._schedule_cache) > Constants.SCHEDULE_CACHE_SIZE:
+                    self._schedule_cache.popitem(last=False)
+
+        # Initialise the clock before the computing hosts receive their schedules,
+        # so that they wait for this run of the clock to stop
+        self._clock.initialise(self._circuit_max_execution_time, event_ticks, clock_shots)
+
+        # The sampled shots are drawn from a new seed for every run
+        seed = int(np.random.randint(2 ** 31)) if key is not None else None
+
+        if key is not None and key == self._delivered_schedule_key:
+            message = json.dumps(
+                {
+                    "type": "bind_parameters",
+                    "values": values,
+                    "seed": seed,
+                    "offset": offset,
+                }
+            )
+            for computing_host_id in computing_host_schedules:
+                self.send_classical(computing_host_id, message)
+            return
+
+        # Every computing host only receives and parses its own operations
+        for computing_host_id, schedule in computing_host_schedules.items():
+            if key is not None:
+                schedule = self._bind_schedule(schedule, values, seed)
+            self.send_classical(
+                computing_host_id, json.dumps(schedule, cls=NumpyEncoder)
+            )
+        self._delivered_schedule_key = key
+
+    def _compile_schedules(
+        self, circuit: Circuit, shots: int
+    ) -> Tuple[Dict[str, List[dict]], List[int], int]:
+        """
+        Generate the distributed schedules of a circuit
 
         Args:
             circuit (Circuit): The Circuit object which contains information
                 regarding a quantum circuit
+            shots (int): Number of times the schedules are performed
+
+        Returns:
+            (tuple): The schedules of the computing hosts, the ticks at which the
+                computing hosts have an operation and the number of shots the
+                clock runs
         """
 
         distributed_circuit = self._generate_distributed_circuit(circuit)
@@ -433,49 +805,481 @@ class ControllerHost(Host):
         (
             computing_host_schedules,
             max_execution_time,
+            self._makespan_reduction,
         ) = self._create_distributed_schedules(distributed_circuit)
         self._circuit_max_execution_time = max_execution_time
 
-        self.send_broadcast(json.dumps(computing_host_schedules, cls=NumpyEncoder))
+        # Every shot of a circuit with only terminal measurements evolves the same
+        # state, so the schedules are run once and the shots are sampled from it
+        if shots > 1 and circuit.has_terminal_measurements():
+            self._sample_terminal_measurements(circuit, computing_host_schedules, shots)
+            shots = 1
+
+        # The clock only ticks when at least one of the computing hosts has an
+        # operation
+        event_ticks = self._get_event_ticks(computing_host_schedules)
+
+        return computing_host_schedules, event_ticks, shots
+
+    @staticmethod
+    def _parameter_values(
+        circuit: Circuit, parameters: Optional[Dict[str, float]]
+    ) -> Dict[str, float]:
+        """
+        Check that every symbolic parameter of the circuit has a value
+
+        Args:
+            circuit (Circuit): The Circuit object which contains information
+                regarding a quantum circuit
+            parameters (dict): The values of the parameters
+
+        Returns:
+            (dict): The value of every parameter of the circuit, which is empty if
+                the circuit is not parametric
+        """
+
+        parameters = parameters if parameters is not None else {}
+        missing = [name for name in circuit.parameters() if name not in parameters]
+        if missing:
+            raise ValueError(
+                "No value was given for the parameters: {0}".format(", ".join(missing))
+            )
+
+        return {name: float(parameters[name]) for name in circuit.parameters()}
+
+    @staticmethod
+    def _schedule_key(circuit: Circuit, shots: int) -> str:
+        """
+        Get the key of the structure of a parametric circuit, which does not
+        depend on the values of its parameters
+
+        Args:
+            circuit (Circuit): The Circuit object which contains information
+                regarding a quantum circuit
+            shots (int): Number of times the schedules are performed
+
+        Returns:
+            (str): The key of the compiled schedules of the circuit
+        """
 
-        # Wait for the computing hosts to receive the broadcast
+        layers = [[op.get_dict() for op in layer.operations] for layer in circuit.layers]
+        return json.dumps([circuit.q_map, layers, shots], cls=NumpyEncoder, sort_keys=True)
+
+    @staticmethod
+    def _shift_schedules(cached: dict, offset: int):
+        """
+        Move the cached schedules of a parametric circuit along by a number of
+        ticks, so that they start at the tick the clock is at
+
+        Args:
+            cached (dict): The cached schedules of the circuit and their ticks
+            offset (int): The number of ticks to move the schedules by
+        """
+
+        for schedule in cached["schedules"].values():
+            for op in schedule:
+                op["layer_end"] += offset
+
+        cached["event_ticks"] = [tick + offset for tick in cached["event_ticks"]]
+        cached["start_tick"] += offset
+        cached["max_execution_time"] += offset
+
+    @staticmethod
+    def _bind_schedule(
+        schedule: List[dict], values: Dict[str, float], seed: int
+    ) -> List[dict]:
+        """
+        Get a copy of a compiled schedule with the values of the parameters and
+        the seed of the sampled shots, leaving the cached schedule untouched
+
+        Args:
+            schedule (list): The compiled schedule of a computing host
+            values (dict): The value of every parameter
+            seed (int): The seed of the sampled shots
+
+        Returns:
+            (list): The schedule to send to the computing host
+        """
+
+        bound_schedule = []
+        for op in schedule:
+            if isinstance(op.get("gate_param"), Parameter):
+                name = op["gate_param"].name
+                op = dict(op, gate_param={"parameter": name, "value": values[name]})
+            elif op["name"] == Constants.SAMPLE:
+                op = dict(op, seed=seed)
+            bound_schedule.append(op)
+
+        return bound_schedule
+
+    @staticmethod
+    def _sample_terminal_measurements(
+        circuit: Circuit, computing_host_schedules: Dict[str, List[dict]], shots: int
+    ):
+        """
+        Replace the measurements of the circuit in the schedules with SAMPLE
+        operations, which draw the bits of all the shots from the final state. The
+        measurements the distributed operations add for the EPR pairs are kept.
+
+        Args:
+            circuit (Circuit): The circuit, which only has terminal measurements
+            computing_host_schedules (dict): The schedules of the computing hosts
+            shots (int): Number of shots to sample
+        """
+
+        measured_qubits = set()
+        for layer in circuit.layers:
+            for op in layer.operations:
+                if op.name == Constants.MEASURE:
+                    measured_qubits.add((op.computing_host_ids[0], op.qids[0]))
+
+        # The computing hosts sharing entangled qubits draw from the same seed
+        seed = int(np.random.randint(2 ** 31))
+
+        for computing_host_id, schedule in computing_host_schedules.items():
+            for op in schedule:
+                if (
+                    op["name"] == Constants.MEASURE
+                    and (computing_host_id, op["qids"][0]) in measured_qubits
+                ):
+                    op["name"] = Constants.SAMPLE
+                    op["shots"] = shots
+                    op["seed"] = seed
+
+    def generate_and_send_schedules(
+        self,
+        circuit: Circuit,
+        shots: int = 1,
+        parameters: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Generate and send distributed schedules to all the computing hosts
+        associated to the circuit. With more than one shot, the schedules are
+        delivered once and performed *shots* times, and the computing hosts send
+        back the measurement counts over all the shots. If the circuit only has
+        terminal measurements, the schedules are performed once and the shots are
+        sampled from the final state. The symbolic parameters of the circuit are
+        bound to their values in the delivered schedules, so running the same
+        circuit again with other values only sends the values.
+
+        Args:
+            circuit (Circuit): The Circuit object which contains information
+                regarding a quantum circuit
+            shots (int): Number of times the schedules are performed
+            parameters (dict): The values of the symbolic parameters of the circuit
+        """
+
+        self._send_schedules(circuit, shots, parameters)
+
+        # Wait for the computing hosts to receive their schedules
+        replies = []
         for host_id in self._computing_host_ids:
-            self.get_next_classical(host_id, wait=-1)
+            replies.append(self.get_next_classical(host_id, wait=-1))
+        self._schedules_delivered.set()
 
-        # Initialise the clock and start running the algorithm
-        self._clock.initialise(self._circuit_max_execution_time)
+        if not self._schedules_accepted(replies):
+            self._delivered_schedule_key = None
+            return
+
+        # Start running the algorithm
         self._clock.start()
 
-    def receive_results(self):
+    async def generate_and_send_schedules_async(
+        self,
+        circuit: Circuit,
+        shots: int = 1,
+        parameters: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Generate and send distributed schedules to all the computing hosts
+        associated to the circuit, and run them on the coroutine based execution
+        engine. The controller host should be created with an AsyncClock.
+
+        Args:
+            circuit (Circuit): The Circuit object which contains information
+                regarding a quantum circuit
+            shots (int): Number of times the schedules are performed
+            parameters (dict): The values of the symbolic parameters of the circuit
+        """
+
+        if not isinstance(self._clock, AsyncClock):
+            raise TypeError(
+                "The coroutine based execution engine needs a controller host "
+                "created with an AsyncClock"
+            )
+
+        self._send_schedules(circuit, shots, parameters)
+
+        # Wait for the computing hosts to receive their schedules
+        replies = []
+        for host_id in self._computing_host_ids:
+            replies.append(await self._get_next_classical_async(host_id))
+        self._schedules_delivered.set()
+
+        if not self._schedules_accepted(replies):
+            self._delivered_schedule_key = None
+            return
+
+        await self._clock.start_async()
+
+    def _schedules_accepted(self, replies: list) -> bool:
+        """
+        Check if every computing host accepted its schedule. If a schedule was
+        rejected, the clock is stopped without running, so that the computing
+        hosts send their results and errors straight away.
+
+        Args:
+            replies (list): The replies of the computing hosts to the schedules
+
+        Returns:
+            (bool): If every computing host accepted its schedule
+        """
+
+        if all(reply.content != Constants.SCHEDULE_REJECTED for reply in replies):
+            return True
+
+        self._clock.stop_clock()
+        return False
+
+    async def _get_next_classical_async(self, host_id: str):
         """
-        Receive the final output results from all the computing hosts
+        Await the next classical message from a computing host without blocking
+        the event loop
+
+        Args:
+            host_id (str): The ID of the computing host
+
+        Returns:
+            (Message): The next classical message from the computing host
+        """
+
+        message = self.get_next_classical(host_id, wait=0)
+        while message is None:
+            await asyncio.sleep(Constants.ASYNC_POLL_INTERVAL)
+            message = self.get_next_classical(host_id, wait=0)
+
+        return message
+
+    def receive_results(self, on_record: Optional[Callable[[str, list], None]] = None):
+        """
+        Receive the final output results from all the computing hosts. The
+        measurement records streamed by the computing hosts are passed to
+        *on_record* as soon as they arrive.
+
+        Args:
+            on_record (Callable): Function called with the ID of the computing
+                host and every measurement record [shot, tick, bit_id, bit] it streams
         """
 
+        for host_id, record in self.measurement_records():
+            if on_record is not None:
+                on_record(host_id, record)
+
+    def measurement_records(
+        self, timeout: float = Constants.SCHEDULE_DELIVERY_TIMEOUT
+    ) -> Iterator[Tuple[str, list]]:
+        """
+        Iterate over the measurement records streamed by the computing hosts as
+        soon as they arrive, while the schedules are still being performed. It can
+        be started on another thread before the schedules are sent, in which case
+        the computing hosts are only read once they replied to their schedules.
+        The iteration ends once every computing host has sent its final results,
+        which are then available in the results property.
+
+        Args:
+            timeout (float): Time in seconds to wait for the schedules to be
+                delivered by *generate_and_send_schedules*
+
+        Returns:
+            (iterator): The ID of the computing host and the measurement record
+                [shot, tick, bit_id, bit], for every record streamed
+        """
+
+        if not self._schedules_delivered.wait(timeout):
+            raise RuntimeError(
+                "No schedules were delivered to the computing hosts within "
+                "{0} seconds to read the results of".format(timeout)
+            )
+
+        # Every computing host is read by its own thread, so that the records
+        # are forwarded in the order they arrive from all the computing hosts
+        messages = queue.Queue()
+        readers = [
+            DaemonThread(self._read_results, args=(host_id, messages))
+            for host_id in self._computing_host_ids
+        ]
+
         results = {}
+        pending_hosts = len(self._computing_host_ids)
+
+        while pending_hosts:
+            host_id, content = messages.get()
+            if content is None:
+                pending_hosts -= 1
+            elif isinstance(content, list):
+                yield host_id, content
+            else:
+                results.update(content)
 
-        for host_id in self._computing_host_ids:
-            result = self.get_next_classical(host_id, wait=-1)
+        for reader in readers:
+            reader.join()
 
-            # I think this is a bug with QuNetSim... Adding a hack for now
-            # to overcome it...
-            if result.content == "ACK":
-                result = self.get_next_classical(host_id, wait=-1)
+        self._results = results
+        self._schedules_delivered.clear()
 
-            try:
-                result = result.content
-                results.update(json.loads(result))
-            except json.decoder.JSONDecodeError:
-                pass
+    def _read_results(self, host_id: str, messages: queue.Queue):
+        """
+        Read the measurement records and the final results of a computing host,
+        and put them on the queue of messages. The final results announce the
+        number of streamed records, since the records may arrive after them.
+
+        Args:
+            host_id (str): The ID of the computing host
+            messages (Queue): Queue of the computing host IDs and the decoded
+                messages, which receives None once the computing host is done
+        """
+
+        records = 0
+        total_records = None
+
+        try:
+            while total_records is None or records < total_records:
+                message = self.get_next_classical(host_id, wait=-1)
+                content = self._decode_results_message(message)
+                if content is None:
+                    continue
+
+                if isinstance(content, list):
+                    records += 1
+                else:
+                    total_records = self._pop_streamed_records(host_id, content)
+                messages.put((host_id, content))
+        except Exception as error:
+            messages.put((host_id, self._results_error(host_id, repr(error))))
+        finally:
+            messages.put((host_id, None))
+
+    @staticmethod
+    def _pop_streamed_records(host_id: str, content: dict) -> int:
+        """
+        Take the number of streamed records out of the final results of a
+        computing host
+
+        Args:
+            host_id (str): The ID of the computing host
+            content (dict): The decoded final results message
+
+        Returns:
+            (int): The number of measurement records the computing host streamed
+        """
+
+        if not isinstance(content, dict) or not isinstance(content.get(host_id), dict):
+            raise ValueError(
+                "Unexpected results message from {0}: {1!r}".format(host_id, content)
+            )
+
+        return content[host_id].pop("streamed_records", 0)
+
+    @staticmethod
+    def _results_error(host_id: str, message: str) -> dict:
+        """
+        Build the results of a computing host whose results could not be read
+
+        Args:
+            host_id (str): The ID of the computing host
+            message (str): The error message
+
+        Returns:
+            (dict): The error results of the computing host
+        """
+
+        return {host_id: {"type": "error", "message": message}}
+
+    async def receive_results_async(
+        self, on_record: Optional[Callable[[str, list], None]] = None
+    ):
+        """
+        Await the final output results from all the computing hosts without
+        blocking the event loop. The measurement records streamed by the
+        computing hosts are passed to *on_record*.
+
+        Args:
+            on_record (Callable): Function called with the ID of the computing
+                host and every measurement record [shot, tick, bit_id, bit] it streams
+        """
+
+        results = {}
+
+        for host_id in self._computing_host_ids:
+            records = 0
+            total_records = None
+
+            while total_records is None or records < total_records:
+                message = await self._get_next_classical_async(host_id)
+                content = self._decode_results_message(message)
+                if content is None:
+                    continue
+
+                if isinstance(content, list):
+                    records += 1
+                    if on_record is not None:
+                        on_record(host_id, content)
+                    continue
+
+                try:
+                    total_records = self._pop_streamed_records(host_id, content)
+                except ValueError as error:
+                    content = self._results_error(host_id, str(error))
+                    total_records = records
+                results.update(content)
 
         self._results = results
 
+    @staticmethod
+    def _decode_results_message(message: Message) -> Optional[Union[dict, list]]:
+        """
+        Decode a results message or a measurement record of a computing host
+
+        Args:
+            message (Message): The message received from the computing host
+
+        Returns:
+            (dict or list): The results of the computing host or the measurement
+                record, or None if the message is not a results message
+        """
+
+        # I think this is a bug with QuNetSim... Adding a hack for now
+        # to overcome it...
+        if message.content == "ACK":
+            return None
+
+        try:
+            return json.loads(message.content)
+        except json.decoder.JSONDecodeError:
+            return None
+
     def schedule_expectation_terms(
         self,
         hamiltonian: List[Tuple[float, List[Tuple[str, int]]]],
         q_map: Dict[str, List[str]],
-    ):
+    ) -> float:
         """
-        Assign the terms of a Hamiltonian to the different computing hosts in the network
+        Assign the terms of a Hamiltonian to the different computing hosts in the network.
+        The terms are partitioned into qubit-wise commuting groups, and the groups are
+        assigned as a whole, so each computing host evaluates every group it receives
+        in one pass. The groups are assigned with the longest processing time first
+        rule, each to the computing host which would finish it the earliest given
+        its number of qubits and gate time. The terms of every computing host are
+        kept in the order of the Hamiltonian.
+
+        Args:
+            hamiltonian (list): The terms of the Hamiltonian, as tuples of a
+                coefficient and a list of (Pauli name, qubit index) observables
+            q_map (dict): The qubit IDs of every computing host
+
+        Returns:
+            (float): The predicted time for the busiest computing host to evaluate
+                its terms
         """
 
         # First check the sanity of the list type-wise
@@ -494,23 +1298,272 @@ class ControllerHost(Host):
             ), "The list of observables must be of tuples of types (str, int)"
 
         # We assume that all QPUs have enough qubits for VQE
-        number_of_computing_hosts = len(q_map.keys())
+        computing_host_ids = list(q_map.keys())
+        compiled_hamiltonian = CompiledHamiltonian(hamiltonian)
+
+        # Time for every computing host to apply one gate to the whole state
+        host_speeds = {
+            computing_host_id: self._expectation_gate_time(computing_host_id)
+            * 2 ** len(q_map[computing_host_id])
+            for computing_host_id in computing_host_ids
+        }
+
+        group_work = [
+            self._expectation_group_work(compiled_hamiltonian, group)
+            for group in compiled_hamiltonian.groups
+        ]
 
-        idx_assignment = np.array_split(
-            np.arange(len(hamiltonian)), number_of_computing_hosts
-        )
+        loads = {computing_host_id: 0 for computing_host_id in computing_host_ids}
+        idx_assignment = {computing_host_id: [] for computing_host_id in computing_host_ids}
 
-        # Then assign the terms as per the number
-        computing_host_ids = list(q_map.keys())
+        for group in sorted(range(len(group_work)), key=lambda g: -group_work[g]):
+            computing_host_id = min(
+                computing_host_ids,
+                key=lambda host_id: loads[host_id] + group_work[group] * host_speeds[host_id],
+            )
+            loads[computing_host_id] += group_work[group] * host_speeds[computing_host_id]
+            idx_assignment[computing_host_id].append(group)
+
+        # Then assign the terms of the groups, in the order of the Hamiltonian
+        for computing_host_id, groups in idx_assignment.items():
+            self.term_assignment[computing_host_id] = compiled_hamiltonian.group_terms(groups)
+
+        return max(loads.values())
+
+    def vqe_session(
+        self,
+        hamiltonian: List[Tuple[float, List[Tuple[str, int]]]],
+        ansatz: Callable[[Dict[str, List[str]], np.ndarray], Circuit],
+        q_map: Dict[str, List[str]],
+    ) -> VQESession:
+        """
+        Create a VQE session, which ships the terms of the Hamiltonian to the
+        computing hosts once and then only runs the ansatz for every new set of
+        parameters. The computing hosts serve the session with
+        *ComputingHost.serve_vqe_session*.
+
+        Args:
+            hamiltonian (list): The terms of the Hamiltonian, as tuples of a
+                coefficient and a list of (Pauli name, qubit index) observables
+            ansatz (Callable): Function which builds the circuit of the ansatz
+                from the qubit map and the parameters
+            q_map (dict): The qubit IDs of every computing host
+
+        Returns:
+            (VQESession): The session, to be opened before the first iteration
+        """
+
+        return VQESession(self, hamiltonian, ansatz, q_map)
+
+    def dispatch_expectation_terms(
+        self,
+        hamiltonian: List[Tuple[float, List[Tuple[str, int]]]],
+        computing_host_ids: Optional[List[str]] = None,
+        chunk_size: int = 1,
+        timeout: float = Constants.EXPECTATION_TIMEOUT,
+    ) -> float:
+        """
+        Evaluate the expectation value of a Hamiltonian on the computing hosts
+        serving expectation terms, which hold the same state. The qubit-wise
+        commuting groups of the terms are queued in chunks, the groups of the most
+        work first, and every computing host pulls the next chunk once it has
+        evaluated its previous one. A computing host which fails a chunk or does
+        not answer in time is given no more chunks, and its chunk is queued again
+        for the others. The groups each computing host evaluated are recorded in
+        the term assignment, and its utilisation over the dispatch in the host
+        utilisation.
+
+        Args:
+            hamiltonian (list): The terms of the Hamiltonian, as tuples of a
+                coefficient and a list of (Pauli name, qubit index) observables
+            computing_host_ids (list): The IDs of the computing hosts to dispatch
+                the terms to. All the computing hosts are used if none are given
+            chunk_size (int): Number of groups of terms sent at once
+            timeout (float): Time in seconds a computing host has to answer a chunk
+
+        Returns:
+            (float): The expectation value of the Hamiltonian
+
+        Raises:
+            RuntimeError: If a chunk could not be evaluated by any computing host
+        """
+
+        if chunk_size < 1:
+            raise ValueError("The chunk size must be at least 1")
+
+        if computing_host_ids is None:
+            computing_host_ids = self._computing_host_ids
 
-        for i in range(number_of_computing_hosts):
-            self.term_assignment[computing_host_ids[i]] = []
+        compiled_hamiltonian = CompiledHamiltonian(hamiltonian)
+        group_work = [
+            self._expectation_group_work(compiled_hamiltonian, group)
+            for group in compiled_hamiltonian.groups
+        ]
+        order = sorted(range(len(group_work)), key=lambda g: -group_work[g])
+
+        chunks = queue.Queue()
+        for index, start in enumerate(range(0, len(order), chunk_size)):
+            chunks.put((index, order[start:start + chunk_size]))
+
+        values = {}
+        failures = {}
+        busy_time = {computing_host_id: 0.0 for computing_host_id in computing_host_ids}
+        evaluated_groups = {computing_host_id: [] for computing_host_id in computing_host_ids}
+
+        start_time = time.monotonic()
+        threads = [
+            DaemonThread(
+                self._dispatch_chunks,
+                args=(computing_host_id, compiled_hamiltonian, chunks, values,
+                      busy_time, evaluated_groups, failures, timeout),
+            )
+            for computing_host_id in computing_host_ids
+        ]
+        for thread in threads:
+            thread.join()
+        elapsed_time = time.monotonic() - start_time
+
+        if not chunks.empty():
+            raise RuntimeError(
+                "The expectation terms could not be evaluated: {0}".format(
+                    "; ".join(
+                        "{0}: {1}".format(computing_host_id, message)
+                        for computing_host_id, message in failures.items()
+                    )
+                )
+            )
+
+        self._host_utilisation = {
+            computing_host_id: busy_time[computing_host_id] / elapsed_time if elapsed_time > 0 else 0.0
+            for computing_host_id in computing_host_ids
+        }
+        for computing_host_id, groups in evaluated_groups.items():
+            self.term_assignment[computing_host_id] = compiled_hamiltonian.group_terms(groups)
+
+        return float(sum(values.values()))
+
+    def _dispatch_chunks(
+        self,
+        computing_host_id: str,
+        hamiltonian: CompiledHamiltonian,
+        chunks: queue.Queue,
+        values: Dict[int, float],
+        busy_time: Dict[str, float],
+        evaluated_groups: Dict[str, List[int]],
+        failures: Dict[str, str],
+        timeout: float,
+    ):
+        """
+        Send the chunks of the queue to a computing host one at a time, until
+        every chunk is evaluated, and then tell the computing host there are no
+        more chunks. If the computing host fails a chunk or does not answer in
+        time, the chunk is queued again and the computing host gets no more chunks.
+
+        Args:
+            computing_host_id (str): The ID of the computing host
+            hamiltonian (CompiledHamiltonian): The compiled Hamiltonian
+            chunks (Queue): Queue of the indices of the chunks and their groups
+            values (dict): Expectation value of every evaluated chunk
+            busy_time (dict): Time every computing host spent on its chunks
+            evaluated_groups (dict): Groups evaluated by every computing host
+            failures (dict): Error of every computing host which failed a chunk
+            timeout (float): Time in seconds the computing host has to answer a chunk
+        """
+
+        while True:
+            try:
+                chunk = chunks.get_nowait()
+            except queue.Empty:
+                # The chunks of the other computing hosts may still be queued again
+                if chunks.unfinished_tasks == 0:
+                    break
+                time.sleep(Constants.ASYNC_POLL_INTERVAL)
+                continue
+
+            index, groups = chunk
+            start_time = time.monotonic()
+            message = {
+                "type": "expectation_terms",
+                "chunk": index,
+                "terms": hamiltonian.group_terms(groups),
+            }
+            self.send_classical(computing_host_id, json.dumps(message, cls=NumpyEncoder))
+
+            content = self._receive_chunk_value(computing_host_id, index, start_time + timeout)
+            if content.get("type") != "expectation_value":
+                failures[computing_host_id] = content["message"]
+                chunks.put(chunk)
+                chunks.task_done()
+                break
+
+            busy_time[computing_host_id] += time.monotonic() - start_time
+            values[index] = content["val"]
+            evaluated_groups[computing_host_id].extend(groups)
+            chunks.task_done()
+
+        self.send_classical(computing_host_id, json.dumps({"type": "expectation_done"}))
+
+    def _receive_chunk_value(self, computing_host_id: str, index: int, deadline: float) -> dict:
+        """
+        Wait for the answer of a computing host to a chunk of expectation terms
+
+        Args:
+            computing_host_id (str): The ID of the computing host
+            index (int): The index of the chunk
+            deadline (float): Monotonic time by which the answer should arrive
+
+        Returns:
+            (dict): The expectation value of the chunk, or an error if the
+                computing host failed the chunk or did not answer in time
+        """
+
+        while True:
+            remaining = deadline - time.monotonic()
+            message = self.get_next_classical(computing_host_id, wait=max(remaining, 0))
+            if message is None:
+                return {
+                    "type": "error",
+                    "message": "No expectation value was received for chunk {0}".format(index),
+                }
+
+            content = self._decode_results_message(message)
+            if isinstance(content, dict) and content.get("type") in ("expectation_value", "error"):
+                return content
+
+    def _expectation_gate_time(self, computing_host_id: str) -> float:
+        """
+        Return the time a computing host takes for the basis rotations of the
+        expectation values
+
+        Args:
+            computing_host_id (str): The ID of the computing host
+
+        Returns:
+            (float): The execution time of a Hadamard gate on the computing host
+        """
+
+        operation_time = self._gate_time.get(computing_host_id, DefaultOperationTime)
+        return operation_time[Constants.SINGLE][Operation.H]
+
+    @staticmethod
+    def _expectation_group_work(hamiltonian: CompiledHamiltonian, group: np.ndarray) -> int:
+        """
+        Estimate the number of passes over the state to evaluate a group of
+        qubit-wise commuting terms: one for each rotated qubit, one for summing
+        the terms, and one for each Pauli operator of the terms
+
+        Args:
+            hamiltonian (CompiledHamiltonian): The compiled Hamiltonian
+            group (np.ndarray): The indices of the terms of the group
+
+        Returns:
+            (int): The estimated work of the group
+        """
 
-        for i, arr in enumerate(idx_assignment):
-            for val in arr:
-                self.term_assignment[computing_host_ids[i]].append(hamiltonian[val])
+        x_mask = int(np.bitwise_or.reduce(hamiltonian.x_masks[group]))
+        supports = hamiltonian.x_masks[group] | hamiltonian.z_masks[group]
 
-        return
+        return bin(x_mask).count("1") + 1 + sum(bin(int(s)).count("1") for s in supports)
 
 
 class NumpyEncoder(json.JSONEncoder):
@@ -519,4 +1572,8 @@ class NumpyEncoder(json.JSONEncoder):
             return obj.tolist()
         if isinstance(obj, complex):
             return obj.real, obj.imag
+        if isinstance(obj, CompiledHamiltonian):
+            return obj.terms
+        if isinstance(obj, Parameter):
+            return {"parameter": obj.name}
         return json.JSONEncoder.default(self, obj)
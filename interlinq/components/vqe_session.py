@@ -0,0 +1,150 @@
+import json
+from typing import Callable, Dict, List, Tuple, Union
+
+import numpy as np
+
+from ..objects import Circuit, Layer, Operation
+from ..utils.constants import Constants
+
+
+class VQESession:
+    """
+    VQE session of a controller host, which keeps the network, the computing
+    hosts and the Hamiltonian resident across the iterations. The terms of the
+    Hamiltonian are shipped to the computing hosts once, when the session opens,
+    and every iteration only runs the ansatz for new parameters and collects
+    the energy. The computing hosts serve the session with
+    *ComputingHost.serve_vqe_session*.
+    """
+
+    def __init__(
+        self,
+        controller_host,
+        hamiltonian: List[Tuple[float, List[Tuple[str, int]]]],
+        ansatz: Callable[[Dict[str, List[str]], np.ndarray], Circuit],
+        q_map: Dict[str, List[str]],
+    ):
+        """
+        Args:
+            controller_host (ControllerHost): The controller host of the session
+            hamiltonian (list): The terms of the Hamiltonian, as tuples of a
+                coefficient and a list of (Pauli name, qubit index) observables
+            ansatz (Callable): Function which builds the circuit of the ansatz
+                from the qubit map and the parameters
+            q_map (dict): The qubit IDs of every computing host
+        """
+
+        self._controller_host = controller_host
+        self._hamiltonian = hamiltonian
+        self._ansatz = ansatz
+        self._q_map = q_map
+
+        self._is_open = False
+        self._iterations = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def iterations(self):
+        """
+        Get the number of iterations performed in the session
+
+        Returns:
+            (int): The number of energies calculated
+        """
+        return self._iterations
+
+    @property
+    def is_open(self):
+        """
+        Get if the session is open
+
+        Returns:
+            (bool): If the computing hosts are serving the session
+        """
+        return self._is_open
+
+    def open(self):
+        """
+        Assign the terms of the Hamiltonian to the computing hosts and ship
+        them, to be kept by the computing hosts for the whole session
+        """
+
+        if self._is_open:
+            return
+
+        controller_host = self._controller_host
+        controller_host.schedule_expectation_terms(self._hamiltonian, self._q_map)
+
+        for computing_host_id in controller_host.computing_host_ids:
+            terms = controller_host.term_assignment.get(computing_host_id, [])
+            message = {"type": "hamiltonian", "terms": terms}
+            controller_host.send_classical(computing_host_id, json.dumps(message))
+
+        self._is_open = True
+
+    def energy(self, parameters: Union[np.ndarray, Dict[str, float]]) -> float:
+        """
+        Run the ansatz with the parameters, and collect the expectation value of
+        the Hamiltonian on the computing hosts. If the ansatz has symbolic
+        parameters, the parameters are their values by name, and the schedules
+        delivered by the first iteration are only bound to the new values.
+
+        Args:
+            parameters (np.ndarray or dict): The parameters of the ansatz
+
+        Returns:
+            (float): The energy for the parameters
+        """
+
+        if not self._is_open:
+            raise RuntimeError("The VQE session is not open")
+
+        controller_host = self._controller_host
+        circuit = self._ansatz(self._q_map, parameters)
+
+        # The computing hosts with terms report the expectation value of their
+        # kept terms once the ansatz has been performed
+        ops = [
+            Operation(name=Constants.SEND_EXP, computing_host_ids=[computing_host_id])
+            for computing_host_id in self._q_map
+            if controller_host.term_assignment.get(computing_host_id)
+        ]
+        circuit = Circuit(self._q_map, circuit.layers + [Layer(ops)])
+
+        values = parameters if circuit.parameters() else None
+        controller_host.generate_and_send_schedules(circuit, parameters=values)
+        controller_host.receive_results()
+
+        energy = 0.0
+        for computing_host_id, result in controller_host.results.items():
+            if result["type"] == "error":
+                raise RuntimeError(
+                    "Computing host {0} failed: {1}".format(
+                        computing_host_id, result["message"]
+                    )
+                )
+            if result["type"] == "expectation_value":
+                energy += result["val"]
+
+        self._iterations += 1
+        return energy
+
+    def close(self):
+        """
+        Close the session, releasing the computing hosts from serving it
+        """
+
+        if not self._is_open:
+            return
+
+        for computing_host_id in self._controller_host.computing_host_ids:
+            message = {"type": "close_session"}
+            self._controller_host.send_classical(computing_host_id, json.dumps(message))
+
+        self._is_open = False
@@ -1,4 +1,5 @@
 from .circuit import Circuit
 from .layer import Layer
 from .operation import Operation
+from .parameter import Parameter
 from .qubit import Qubit
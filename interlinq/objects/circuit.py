@@ -1,5 +1,7 @@
 from .layer import Layer
+from .parameter import Parameter
 from .qubit import Qubit
+from ..utils import Constants
 
 from typing import List, Dict, Optional
 
@@ -162,6 +164,48 @@ class Circuit(object):
 
         return total_qubits
 
+    def parameters(self) -> List[str]:
+        """
+        Get the names of the symbolic parameters of the circuit, which are bound
+        to values when the circuit is run
+
+        Returns:
+            (list): The sorted names of the parameters
+        """
+
+        names = set()
+        for layer in self._layers:
+            for op in layer.operations:
+                if isinstance(op.gate_param, Parameter):
+                    names.add(op.gate_param.name)
+
+        return sorted(names)
+
+    def has_terminal_measurements(self) -> bool:
+        """
+        Check if the circuit only measures its qubits at the end of their
+        timelines, and no operation depends on the measured bits. Every shot of
+        such a circuit evolves the same state before it is measured.
+
+        Returns:
+            (bool): If the circuit has measurements and they are all terminal
+        """
+
+        unitary_operations = [Constants.PREPARE_QUBITS, Constants.SINGLE, Constants.TWO_QUBIT]
+        measured_qubits = set()
+
+        for layer in self._layers:
+            for op in layer.operations:
+                if any(qubit_id in measured_qubits for qubit_id in op.qids or []):
+                    return False
+
+                if op.name == Constants.MEASURE:
+                    measured_qubits.update(op.qids)
+                elif op.name not in unitary_operations:
+                    return False
+
+        return len(measured_qubits) > 0
+
     def update_layer(self, index: int, layer: Layer):
         """
         Update a layer object at a particular index with a new value.
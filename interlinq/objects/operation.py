@@ -1,9 +1,10 @@
 from numbers import Complex
 
+from .parameter import Parameter
 from ..utils import Constants
 import warnings
 
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 
 
 class Operation(object):
@@ -35,7 +36,7 @@ class Operation(object):
         qids: List[str] = None,
         cids: List[str] = None,
         gate: str = None,
-        gate_param: Optional[List[Complex]] = None,
+        gate_param: Optional[Union[List[Complex], Parameter]] = None,
         computing_host_ids: Optional[List[str]] = None,
         pre_allocated_qubits: bool = False,
         hamiltonian: List[Tuple[float, List[Tuple[str, int]]]] = None,
@@ -49,7 +50,8 @@ class Operation(object):
                 list will be the ID of the computing host where the operation is being performed
             cids (list): List of classical bit IDs associated to the operation
             gate (str): Name of the single or the two-qubit gate
-            gate_param (list): parameter for rotational gates
+            gate_param (list): parameter for rotational gates, which can be a
+                symbolic Parameter bound to a value when the circuit is run
             computing_host_ids (list): List of associated ID/IDS of the computing host where
                 the operation/gate is being performed. The first computing host in the list
                 would be the one where the operation is being performed.
@@ -59,6 +61,10 @@ class Operation(object):
 
         if name not in Constants.OPERATION_NAMES:
             raise (InputError("Operation is invalid"))
+        if isinstance(gate_param, Parameter) and (
+            name != Constants.SINGLE or gate not in (self.RX, self.RY, self.RZ)
+        ):
+            raise (InputError("Only single qubit rotation gates take a symbolic parameter"))
         self._name = name
 
         self._qids = qids
@@ -122,7 +128,7 @@ class Operation(object):
         Get the *gate_param* associated to the operation, if any
 
         Returns:
-            (list): parameter for rotational gates
+            (list): parameter for rotational gates, or the symbolic Parameter
         """
 
         return self._gate_param
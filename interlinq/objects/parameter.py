@@ -0,0 +1,37 @@
+class Parameter(object):
+    """
+    Symbolic parameter of a rotation gate, which is bound to a value only when
+    the circuit is run
+    """
+
+    def __init__(self, name: str):
+        """
+        Returns the important things for a symbolic parameter
+
+        Args:
+            name (str): Name of the parameter, which the values are bound to
+        """
+
+        self._name = name
+
+    def __str__(self):
+        return self._name
+
+    def __repr__(self):
+        return "Parameter({0!r})".format(self._name)
+
+    def __eq__(self, other):
+        return isinstance(other, Parameter) and other.name == self._name
+
+    def __hash__(self):
+        return hash((Parameter, self._name))
+
+    @property
+    def name(self):
+        """
+        Get the *name* of the parameter
+
+        Returns:
+            (str): Name of the parameter
+        """
+        return self._name
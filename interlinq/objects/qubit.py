@@ -1,5 +1,8 @@
 from interlinq.utils import Constants
 from .operation import Operation
+from .parameter import Parameter
+
+from typing import Union
 
 
 class Qubit(object):
@@ -103,13 +106,14 @@ class Qubit(object):
         """
         self._current_layer = layer
 
-    def single(self, gate: str, gate_param: list = None):
+    def single(self, gate: str, gate_param: Union[list, Parameter] = None):
         """
         Operation to apply a single gate to the qubit
 
         Args:
             gate (str): Name of the single qubit gate to be applied
-            gate_param (list): Parameter for rotational gates
+            gate_param (list): Parameter for rotational gates, which can be a
+                symbolic Parameter bound to a value when the circuit is run
         """
         op = Operation(
             name=Constants.SINGLE,
@@ -1,2 +1,3 @@
 from .default_operation_time import DefaultOperationTime
 from .constants import Constants
+from .matrix_cache import MatrixCache
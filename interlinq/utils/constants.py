@@ -33,7 +33,48 @@ class Constants:
     
     MEASURE = "MEASURE"
 
+    # Terminal measurement which the controller host turns into sampling, for
+    # the circuits whose shots all evolve the same state
+    SAMPLE = "SAMPLE"
+
+    # Reply of a computing host which received a schedule that is not valid
+    SCHEDULE_REJECTED = "SCHEDULE_REJECTED"
+
     DISTRIBUTED_CONTROL_CIRCUIT_LEN = 8
 
     DEFAULT_SINGLE_GATE_TIME = 1
     DEFAULT_SINGLE_OPERATION_TIME = 1
+
+    # Default number of pre-allocated qubits, which hold the EPR halves, of a
+    # computing host
+    DEFAULT_PRE_ALLOCATED_QUBITS = 1
+
+    # Interval in seconds at which the coroutine based execution engine polls
+    # for incoming messages and qubits
+    ASYNC_POLL_INTERVAL = 0.001
+
+    # Default time in seconds a computing host waits for the EPR half of a pair
+    EPR_TIMEOUT = 2.5
+
+    # Default number of EPR pairs a computing host shares in advance with each
+    # of the computing hosts it is linked to
+    EPR_POOL_DEPTH = 2
+
+    # Maximum number of decoded custom gate matrices the computing hosts share
+    GATE_MATRIX_CACHE_SIZE = 256
+
+    # Maximum number of rotation gate matrices, one for every gate and angle,
+    # the computing hosts share
+    ROTATION_MATRIX_CACHE_SIZE = 1024
+
+    # Maximum number of compiled schedules of parametric circuits a controller
+    # host keeps
+    SCHEDULE_CACHE_SIZE = 16
+
+    # Default time in seconds a controller host waits for the schedules to be
+    # delivered before reading the results of the computing hosts
+    SCHEDULE_DELIVERY_TIMEOUT = 60
+
+    # Default time in seconds a controller host waits for a computing host to
+    # evaluate a chunk of expectation terms
+    EXPECTATION_TIMEOUT = 30
@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy as np
+
+
+class MatrixCache:
+    """
+    Bounded cache of gate matrices, shared by the computing hosts. The least
+    recently used matrix is evicted once the cache is full, and the hits and
+    misses are counted to size the cache for the circuits which are run.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Args:
+            max_size (int): Maximum number of matrices held in the cache
+        """
+
+        self._max_size = max_size
+        self._matrices = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._matrices)
+
+    @property
+    def hits(self):
+        """
+        Get the number of matrices found in the cache
+
+        Returns:
+            (int): The number of cache hits
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        Get the number of matrices built because they were not in the cache
+
+        Returns:
+            (int): The number of cache misses
+        """
+        return self._misses
+
+    def get(self, key: Hashable, build: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Get the matrix cached under the key, building it on a miss. The matrix
+        is read-only, since it is shared by all the operations which use it.
+
+        Args:
+            key (Hashable): Key of the matrix content
+            build (Callable): Function which builds the matrix
+
+        Returns:
+            (np.ndarray): The cached matrix
+        """
+
+        with self._lock:
+            matrix = self._matrices.get(key)
+            if matrix is not None:
+                self._matrices.move_to_end(key)
+                self._hits += 1
+                return matrix
+            self._misses += 1
+
+        matrix = build()
+        matrix.setflags(write=False)
+
+        with self._lock:
+            self._matrices[key] = matrix
+            self._matrices.move_to_end(key)
+            while len(self._matrices) > self._max_size:
+                self._matrices.popitem(last=False)
+
+        return matrix
+
+    def clear(self):
+        """
+        Remove every matrix from the cache, and reset the hit and miss counters
+        """
+
+        with self._lock:
+            self._matrices.clear()
+            self._hits = 0
+            self._misses = 0
@@ -24,24 +24,222 @@ def tensor_product_matrix_list(matrix_list):
     return tmp
 
 
-def expectation_value(terms, vector, number_of_qubits):
-    total = 0
-
-    for term in terms:
-        coefficient, observables = term
-
-        obs_tensor_prod = []
+PAULI_X_BITS = {"PauliX": 1, "PauliY": 1}
+PAULI_Z_BITS = {"PauliY": 1, "PauliZ": 1}
 
-        for _ in range(number_of_qubits):
-            obs_tensor_prod.append(np.eye(2))
 
-        for obs in observables:
-            pauli, index = obs
+def pauli_masks(observables):
+    # Bit masks of the qubits flipped (X, Y) and phased (Y, Z) by a Pauli
+    # string. Bit i of the masks stands for qubit i, and the last observable
+    # of a qubit replaces the earlier ones
+    paulis = {}
+    for pauli, index in observables:
+        paulis[index] = pauli
+
+    x_mask = 0
+    z_mask = 0
+
+    for index, pauli in paulis.items():
+        x_mask |= PAULI_X_BITS.get(pauli, 0) << index
+        z_mask |= PAULI_Z_BITS.get(pauli, 0) << index
+
+    return x_mask, z_mask
+
+
+def walsh_hadamard(vector):
+    # Sum of vector[b] (-1)^popcount(b & z) for every z, in log2(len) passes
+    result = np.array(vector)
+    half = 1
+
+    while half < len(result):
+        pairs = result.reshape(-1, 2, half)
+        result = np.stack((pairs[:, 0] + pairs[:, 1], pairs[:, 0] - pairs[:, 1]), axis=1)
+        result = result.reshape(-1)
+        half *= 2
+
+    return result
+
+
+# Rotations of the Pauli eigenbases into the computational basis, H for X and
+# H S^dagger for Y
+BASIS_ROTATIONS = {
+    "PauliX": np.array([[1, 1], [1, -1]]) / np.sqrt(2),
+    "PauliY": np.array([[1, -1j], [1, 1j]]) / np.sqrt(2),
+}
+
+
+def qubit_wise_commuting_groups(x_masks, z_masks):
+    # Colour the graph of the terms which do not commute qubit-wise, with the
+    # terms of the most conflicts coloured first (Welsh-Powell). Two terms
+    # commute qubit-wise if they apply the same Pauli to every shared qubit
+    x_masks = np.asarray(x_masks, dtype=np.int64)
+    z_masks = np.asarray(z_masks, dtype=np.int64)
+    supports = x_masks | z_masks
+
+    differences = (x_masks[:, None] ^ x_masks[None, :]) | (z_masks[:, None] ^ z_masks[None, :])
+    conflicts = (differences & supports[:, None] & supports[None, :]) != 0
+
+    colours = np.full(len(x_masks), -1)
+    for term in np.argsort(-conflicts.sum(axis=1), kind="stable"):
+        used = set(colours[conflicts[term]].tolist())
+        colour = 0
+        while colour in used:
+            colour += 1
+        colours[term] = colour
+
+    # The groups are ordered by their first term
+    groups = [np.flatnonzero(colours == colour) for colour in range(colours.max(initial=-1) + 1)]
+    return sorted(groups, key=lambda group: group[0])
+
+
+class CompiledHamiltonian:
+    """
+    Hamiltonian whose Pauli strings are encoded once as X and Z bit masks,
+    with the coefficients of the terms, to evaluate its expectation value on a
+    statevector without building the matrices of the observables. The terms
+    are partitioned into qubit-wise commuting groups, which are evaluated
+    together.
+    """
+
+    def __init__(self, terms):
+        """
+        Args:
+            terms (list): The terms of the Hamiltonian, as tuples of a coefficient
+                and a list of (Pauli name, qubit index) observables
+        """
+
+        self._terms = [
+            (coefficient, [tuple(obs) for obs in observables])
+            for coefficient, observables in terms
+        ]
+
+        masks = np.array(
+            [pauli_masks(observables) for _, observables in self._terms], dtype=np.int64
+        ).reshape(-1, 2)
+
+        self._x_masks = masks[:, 0]
+        self._z_masks = masks[:, 1]
+
+        self._coefficients = np.array(
+            [coefficient for coefficient, _ in self._terms], dtype=complex
+        )
+
+        self._groups = qubit_wise_commuting_groups(self._x_masks, self._z_masks)
+
+        self._number_of_qubits = int(
+            max([index + 1 for _, observables in self._terms for _, index in observables],
+                default=0)
+        )
+
+    def __len__(self):
+        return len(self._terms)
+
+    @property
+    def terms(self):
+        """
+        Get the terms of the Hamiltonian
+
+        Returns:
+            (list): The list of (coefficient, observables) terms
+        """
+        return self._terms
+
+    @property
+    def x_masks(self):
+        """
+        Get the bit masks of the qubits flipped by every term
+
+        Returns:
+            (np.ndarray): The X masks, where bit i stands for qubit i
+        """
+        return self._x_masks
+
+    @property
+    def z_masks(self):
+        """
+        Get the bit masks of the qubits phased by every term
+
+        Returns:
+            (np.ndarray): The Z masks, where bit i stands for qubit i
+        """
+        return self._z_masks
+
+    @property
+    def groups(self):
+        """
+        Get the qubit-wise commuting groups of the terms
+
+        Returns:
+            (list): The indices of the terms of every group
+        """
+        return self._groups
+
+    def group_terms(self, groups):
+        """
+        Get the terms of some of the qubit-wise commuting groups, in the order of
+        the Hamiltonian
+
+        Args:
+            groups (list): The indices of the groups
+
+        Returns:
+            (list): The list of (coefficient, observables) terms of the groups
+        """
+        terms = sorted(term for group in groups for term in self._groups[group])
+        return [self._terms[term] for term in terms]
+
+    def expectation_value(self, vector):
+        """
+        Calculate the expectation value of the Hamiltonian. The state is rotated
+        once into the eigenbasis of every qubit-wise commuting group, where all
+        the terms of the group are diagonal and summed at once by a
+        Walsh-Hadamard transform of the probabilities.
+
+        Args:
+            vector (np.ndarray): The statevector, with qubit 0 as the most
+                significant bit of the index
+
+        Returns:
+            (complex): The expectation value
+        """
+
+        vector = np.asarray(vector)
+        number_of_qubits = int(np.log2(len(vector)))
+        if number_of_qubits < self._number_of_qubits:
+            raise ValueError(
+                "The Hamiltonian acts on {0} qubits, but the statevector has {1}".format(
+                    self._number_of_qubits, number_of_qubits
+                )
+            )
+
+        # Axis i of the tensor is qubit i
+        state = vector.reshape((2,) * number_of_qubits)
+
+        total = 0
+        for terms in self._groups:
+            x_mask = int(np.bitwise_or.reduce(self._x_masks[terms]))
+            z_mask = int(np.bitwise_or.reduce(self._z_masks[terms]))
+
+            rotated = state
+            for qubit in range(number_of_qubits):
+                if x_mask >> qubit & 1:
+                    pauli = "PauliY" if z_mask >> qubit & 1 else "PauliX"
+                    rotated = np.moveaxis(
+                        np.tensordot(BASIS_ROTATIONS[pauli], rotated, axes=([1], [qubit])),
+                        0, qubit)
+
+            # Reverse the order of the qubits, for bit i of the index to be qubit i
+            probabilities = (np.abs(rotated) ** 2).transpose().reshape(-1)
+            supports = self._x_masks[terms] | self._z_masks[terms]
+
+            total += np.dot(self._coefficients[terms],
+                            walsh_hadamard(probabilities)[supports])
+
+        return total
 
-            obs_tensor_prod[index] = string_to_qutip_pauli(pauli)
 
-        obs_tensor_prod = tensor_product_matrix_list(obs_tensor_prod)
-
-        total += coefficient * np.vdot(vector, obs_tensor_prod @ vector)
+def expectation_value(terms, vector, number_of_qubits):
+    if not isinstance(terms, CompiledHamiltonian):
+        terms = CompiledHamiltonian(terms)
 
-    return total
+    return terms.expectation_value(vector)
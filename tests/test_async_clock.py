@@ -0,0 +1,128 @@
+import asyncio
+import unittest
+
+from qunetsim.components.network import Network
+
+from interlinq.components import AsyncClock, Clock, ControllerHost
+from interlinq.objects import Circuit, Operation, Qubit
+
+
+class TestAsyncClock(unittest.TestCase):
+
+    # Runs before all tests
+    @classmethod
+    def setUpClass(cls) -> None:
+        pass
+
+    # Runs after all tests
+    @classmethod
+    def tearDownClass(cls) -> None:
+        pass
+
+    def setUp(self):
+        network = Network.get_instance()
+        network.delay = 0
+        network.start()
+
+        self._network = network
+        self._hosts = []
+
+    def tearDown(self):
+        # The measured qubits cannot be released, so the hosts are stopped
+        # before the network stops the backend
+        for host in self._hosts:
+            host.stop(release_qubits=False)
+            self._network.remove_host(host)
+        self._network.stop()
+
+    def _create_network(self, controller_host_id, clock, id_prefix):
+        controller_host = ControllerHost(host_id=controller_host_id, clock=clock)
+        computing_hosts, _ = controller_host.create_distributed_network(
+            num_computing_hosts=2, num_qubits_per_host=1, id_prefix=id_prefix)
+        controller_host.start()
+
+        self._hosts.extend(computing_hosts + [controller_host])
+        self._network.add_hosts(computing_hosts + [controller_host])
+
+        return controller_host, computing_hosts
+
+    @staticmethod
+    def _circuit(id_prefix):
+        q_1 = Qubit(computing_host_id=id_prefix + "0", q_id="q_0_0")
+        q_2 = Qubit(computing_host_id=id_prefix + "1", q_id="q_1_0")
+
+        q_1.single(gate=Operation.X)
+        q_1.two_qubit(gate=Operation.CNOT, target_qubit=q_2)
+        q_2.single(gate=Operation.H)
+        q_2.single(gate=Operation.H)
+
+        q_1.measure(bit_id=q_1.q_id)
+        q_2.measure(bit_id=q_2.q_id)
+
+        q_map = {id_prefix + "0": ["q_0_0"], id_prefix + "1": ["q_1_0"]}
+        return Circuit(q_map, qubits=[q_1, q_2])
+
+    def _run_threaded(self):
+        controller_host, computing_hosts = self._create_network(
+            "host_1", Clock(), "THREAD_QPU_")
+        circuit = self._circuit("THREAD_QPU_")
+
+        def controller_host_protocol(host):
+            host.generate_and_send_schedules(circuit)
+            host.receive_results()
+
+        def computing_host_protocol(host):
+            host.receive_schedule()
+            host.send_results()
+
+        threads = [controller_host.run_protocol(controller_host_protocol)]
+        for computing_host in computing_hosts:
+            threads.append(computing_host.run_protocol(computing_host_protocol))
+        for thread in threads:
+            thread.join()
+
+        return controller_host.results
+
+    def _run_async(self):
+        controller_host, computing_hosts = self._create_network(
+            "host_2", AsyncClock(), "ASYNC_QPU_")
+        circuit = self._circuit("ASYNC_QPU_")
+
+        async def controller_host_protocol(host):
+            await host.generate_and_send_schedules_async(circuit)
+            await host.receive_results_async()
+
+        async def computing_host_protocol(host):
+            await host.receive_schedule_async()
+            await host.send_results_async()
+
+        async def run():
+            await asyncio.gather(
+                controller_host_protocol(controller_host),
+                *(computing_host_protocol(host) for host in computing_hosts))
+
+        asyncio.run(run())
+
+        return controller_host.results
+
+    def test_same_results_as_threaded_engine(self):
+        threaded_results = self._run_threaded()
+        async_results = self._run_async()
+
+        threaded_results = {
+            host_id.replace("THREAD_", ""): result
+            for host_id, result in threaded_results.items()}
+        async_results = {
+            host_id.replace("ASYNC_", ""): result
+            for host_id, result in async_results.items()}
+
+        self.assertEqual(async_results, threaded_results)
+        self.assertEqual(async_results["QPU_0"]["val"], {"q_0_0": 1})
+        self.assertEqual(async_results["QPU_1"]["val"], {"q_1_0": 1})
+
+    def test_requires_async_clock(self):
+        controller_host = ControllerHost(host_id="host_3", clock=Clock())
+        circuit = self._circuit("QPU_")
+
+        with self.assertRaises(TypeError):
+            asyncio.run(controller_host.generate_and_send_schedules_async(circuit))
@@ -0,0 +1,56 @@
+import unittest
+
+from qunetsim.objects import Logger
+
+from interlinq.components import run_batch
+from interlinq.objects import Operation
+from interlinq.objects.circuit import Circuit
+from interlinq.objects.qubit import Qubit
+
+Logger.DISABLED = True
+
+
+def cnot_circuit(flip_control):
+    q_map = {
+        'QPU_0': ['q_0_0'],
+        'QPU_1': ['q_1_0']}
+
+    q_1 = Qubit(computing_host_id="QPU_0", q_id="q_0_0")
+    q_2 = Qubit(computing_host_id="QPU_1", q_id="q_1_0")
+
+    if flip_control:
+        q_1.single(gate=Operation.X)
+    q_1.two_qubit(gate=Operation.CNOT, target_qubit=q_2)
+
+    q_1.measure(bit_id=q_1.q_id)
+    q_2.measure(bit_id=q_2.q_id)
+
+    return Circuit(q_map, qubits=[q_1, q_2])
+
+
+class TestBatch(unittest.TestCase):
+
+    # Runs before all tests
+    @classmethod
+    def setUpClass(cls) -> None:
+        pass
+
+    # Runs after all tests
+    @classmethod
+    def tearDownClass(cls) -> None:
+        pass
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            run_batch([cnot_circuit(True)], (2, 1), chunk_size=0)
+
+    def test_results_in_order(self):
+        circuits = [cnot_circuit(i % 2 == 1) for i in range(4)]
+
+        results = run_batch(circuits, (2, 1), max_workers=2, chunk_size=2)
+
+        self.assertEqual(len(results), 4)
+        for i, result in enumerate(results):
+            self.assertEqual(result['QPU_0']['type'], 'measurement_result')
+            self.assertEqual(result['QPU_0']['val']['q_0_0'], i % 2)
+            self.assertEqual(result['QPU_1']['val']['q_1_0'], i % 2)
@@ -2,7 +2,7 @@ import unittest
 from interlinq.objects.circuit import Circuit
 from interlinq.objects.layer import Layer
 from interlinq.objects.qubit import Qubit
-from interlinq.objects import Operation
+from interlinq.objects import Operation, Parameter
 
 
 class TestCircuit(unittest.TestCase):
@@ -142,3 +142,35 @@ class TestCircuit(unittest.TestCase):
 
         op_names = [op.name for op in layers[3].operations]
         self.assertEqual(op_names, ['TWO_QUBIT'])
+
+    def test_terminal_measurements(self):
+        q_1 = Qubit(computing_host_id='QPU_1', q_id='qubit_1')
+        q_2 = Qubit(computing_host_id='QPU_2', q_id='qubit_2')
+
+        q_1.single(gate=Operation.H)
+        q_1.two_qubit(gate=Operation.CNOT, target_qubit=q_2)
+        q_1.measure(bit_id='bit_1')
+        q_2.measure(bit_id='bit_2')
+
+        self._circuit.create_layers(qubits=[q_1, q_2])
+        self.assertTrue(self._circuit.has_terminal_measurements())
+
+        # A gate controlled by a measured bit depends on the outcome of the shot
+        q_2.classical_ctrl_gate(gate=Operation.X, bit_id='bit_1')
+        self._circuit.create_layers(qubits=[q_1, q_2])
+        self.assertFalse(self._circuit.has_terminal_measurements())
+
+        # Nothing to sample without measurements
+        self.assertFalse(Circuit(self._q_map, layers=[]).has_terminal_measurements())
+
+    def test_parameters(self):
+        q_1 = Qubit(computing_host_id='QPU_1', q_id='qubit_1')
+        q_2 = Qubit(computing_host_id='QPU_2', q_id='qubit_2')
+
+        q_1.single(gate=Operation.RY, gate_param=Parameter('theta_1'))
+        q_2.single(gate=Operation.RX, gate_param=Parameter('theta_0'))
+        q_2.single(gate=Operation.RZ, gate_param=0.5)
+        q_1.single(gate=Operation.RZ, gate_param=Parameter('theta_1'))
+
+        self._circuit.create_layers(qubits=[q_1, q_2])
+        self.assertEqual(self._circuit.parameters(), ['theta_0', 'theta_1'])
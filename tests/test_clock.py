@@ -0,0 +1,269 @@
+import asyncio
+import threading
+import unittest
+
+from interlinq.components import AsyncClock, Clock
+
+
+class DummyComputingHost(object):
+    """
+    Minimal stand-in for a computing host which records the ticks it was
+    triggered on
+    """
+
+    def __init__(self, host_id, clock):
+        self.host_id = host_id
+        self.ticks = []
+        self.shots = 0
+        self.last_shots = []
+        self.errors = []
+        self._clock = clock
+
+    def perform_schedule(self, ticks):
+        self.ticks.append(ticks)
+        self._clock.respond()
+
+    async def perform_schedule_async(self, ticks):
+        await asyncio.sleep(0)
+        self.ticks.append(ticks)
+
+    def complete_shot(self, last_shot=False):
+        self.shots += 1
+        self.last_shots.append(last_shot)
+
+    def _report_error(self, message):
+        self.errors.append(message)
+        self._clock.stop_clock()
+
+
+class TestClock(unittest.TestCase):
+
+    # Runs before all tests
+    @classmethod
+    def setUpClass(cls) -> None:
+        pass
+
+    # Runs after all tests
+    @classmethod
+    def tearDownClass(cls) -> None:
+        pass
+
+    def setUp(self):
+        Clock.reset_clock()
+        self.clock = Clock.get_instance()
+
+        self.host_1 = DummyComputingHost("QPU_1", self.clock)
+        self.host_2 = DummyComputingHost("QPU_2", self.clock)
+        self.clock.attach_host(self.host_1)
+        self.clock.attach_host(self.host_2)
+
+    def tearDown(self):
+        Clock.reset_clock()
+
+    def test_start_without_initialise(self):
+        with self.assertRaises(ValueError):
+            self.clock.start()
+
+    def test_tick_every_step(self):
+        self.clock.initialise(5)
+        self.clock.start()
+
+        self.assertEqual(self.host_1.ticks, [0, 1, 2, 3, 4, 5])
+        self.assertEqual(self.host_2.ticks, [0, 1, 2, 3, 4, 5])
+        self.assertEqual(self.clock.ticks, 6)
+        self.assertTrue(self.clock.has_stopped)
+
+    def test_event_driven_ticks(self):
+        self.clock.initialise(20, event_ticks=[12, 0, 3, 3])
+        self.clock.start()
+
+        self.assertEqual(self.host_1.ticks, [0, 3, 12])
+        self.assertEqual(self.host_2.ticks, [0, 3, 12])
+        self.assertEqual(self.clock.ticks, 21)
+        self.assertTrue(self.clock.has_stopped)
+
+    def test_event_driven_continues_from_current_tick(self):
+        self.clock.initialise(4, event_ticks=[0, 2])
+        self.clock.start()
+
+        self.clock.initialise(10, event_ticks=[2, 5, 8, 11])
+        self.clock.start()
+
+        self.assertEqual(self.host_1.ticks, [0, 2, 5, 8])
+        self.assertEqual(self.clock.ticks, 11)
+
+    def test_shots(self):
+        with self.assertRaises(ValueError):
+            self.clock.initialise(2, shots=0)
+
+        self.clock.initialise(4, event_ticks=[1, 3], shots=3)
+        self.clock.start()
+
+        self.assertEqual(self.host_1.ticks, [1, 3] * 3)
+        self.assertEqual(self.host_1.shots, 3)
+        self.assertEqual(self.host_2.shots, 3)
+        self.assertEqual(self.host_1.last_shots, [False, False, True])
+        self.assertEqual(self.clock.ticks, 5)
+
+        # A single shot does not ask the hosts to complete it
+        self.clock.initialise(6, event_ticks=[5])
+        self.clock.start()
+        self.assertEqual(self.host_1.shots, 3)
+
+    def test_shots_stop_on_error(self):
+        def perform_schedule(ticks, host=self.host_1):
+            if host.shots == 1 and ticks == 1:
+                raise KeyError("q_1")
+            host.ticks.append(ticks)
+            self.clock.respond()
+
+        self.host_1.perform_schedule = perform_schedule
+        self.clock.initialise(2, shots=4)
+        self.clock.start()
+
+        self.assertEqual(self.host_1.ticks, [0, 1, 2, 0])
+        self.assertEqual(self.host_1.shots, 1)
+        self.assertTrue(self.clock.has_stopped)
+
+    def test_tick_wait_times(self):
+        self.clock.initialise(6, event_ticks=[1, 4])
+        self.clock.start()
+
+        wait_times = self.clock.tick_wait_times
+        self.assertEqual(list(wait_times.keys()), [1, 4])
+        self.assertTrue(all(t >= 0 for t in wait_times.values()))
+
+        self.clock.initialise(9)
+        self.assertEqual(self.clock.tick_wait_times, {})
+
+    def test_one_worker_per_host(self):
+        threads = {}
+
+        def perform_schedule(ticks, host=self.host_1):
+            threads.setdefault(threading.get_ident(), []).append(ticks)
+            host.ticks.append(ticks)
+            self.clock.respond()
+
+        self.host_1.perform_schedule = perform_schedule
+        self.clock.initialise(50)
+        self.clock.start()
+
+        self.assertEqual(len(threads), 1)
+        self.assertEqual(self.host_1.ticks, list(range(51)))
+        self.assertEqual(self.host_2.ticks, list(range(51)))
+
+    def test_error_in_schedule(self):
+        def perform_schedule(ticks, host=self.host_1):
+            if ticks == 2:
+                raise KeyError("q_1")
+            host.ticks.append(ticks)
+            self.clock.respond()
+
+        self.host_1.perform_schedule = perform_schedule
+        self.clock.initialise(5)
+        self.clock.start()
+
+        self.assertEqual(self.host_1.ticks, [0, 1])
+        self.assertEqual(self.host_2.ticks, [0, 1, 2])
+        self.assertTrue(self.clock.has_stopped)
+
+        # The failure is recorded on the computing host for its results
+        self.assertEqual(self.host_1.errors,
+                         ["Error in the schedule at tick 2: KeyError('q_1')"])
+        self.assertEqual(self.host_2.errors, [])
+
+    def test_wait_until_stopped(self):
+        self.clock.initialise(3)
+        self.assertFalse(self.clock.wait_until_stopped(timeout=0.01))
+
+        thread = threading.Thread(target=self.clock.start)
+        thread.start()
+        self.assertTrue(self.clock.wait_until_stopped(timeout=5))
+        thread.join()
+
+        self.assertEqual(self.host_1.ticks, [0, 1, 2, 3])
+
+        # A new run of the clock clears the notification of the previous one
+        self.clock.initialise(3)
+        self.assertFalse(self.clock.wait_until_stopped(timeout=0.01))
+
+    def test_detach_host(self):
+        self.clock.detach_host(self.host_2)
+        self.clock.initialise(2)
+        self.clock.start()
+
+        self.assertEqual(self.host_1.ticks, [0, 1, 2])
+        self.assertEqual(self.host_2.ticks, [])
+
+    def test_independent_clocks(self):
+        self.assertIs(Clock.get_instance(), self.clock)
+
+        other_clock = Clock()
+        other_host = DummyComputingHost("QPU_3", other_clock)
+        other_clock.attach_host(other_host)
+
+        other_clock.initialise(3)
+        other_clock.start()
+
+        self.assertEqual(other_host.ticks, [0, 1, 2, 3])
+        self.assertEqual(other_clock.ticks, 4)
+        self.assertEqual(self.host_1.ticks, [])
+        self.assertEqual(self.clock.ticks, 0)
+        self.assertFalse(self.clock.has_stopped)
+
+    def test_async_clock(self):
+        clock = AsyncClock()
+        host_1 = DummyComputingHost("QPU_1", clock)
+        host_2 = DummyComputingHost("QPU_2", clock)
+        clock.attach_host(host_1)
+        clock.attach_host(host_2)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(clock.start_async())
+
+        clock.initialise(10, event_ticks=[0, 4, 7])
+        asyncio.run(clock.start_async())
+
+        self.assertEqual(host_1.ticks, [0, 4, 7])
+        self.assertEqual(host_2.ticks, [0, 4, 7])
+        self.assertEqual(list(clock.tick_wait_times.keys()), [0, 4, 7])
+        self.assertEqual(clock.ticks, 11)
+        self.assertTrue(clock.has_stopped)
+
+    def test_wait_until_stopped_async(self):
+        clock = AsyncClock()
+        host = DummyComputingHost("QPU_1", clock)
+        clock.attach_host(host)
+
+        async def run():
+            clock.initialise(3)
+            waiters = [
+                asyncio.ensure_future(clock.wait_until_stopped_async())
+                for _ in range(100)]
+            await asyncio.sleep(0)
+            self.assertFalse(any(waiter.done() for waiter in waiters))
+
+            await clock.start_async()
+            await asyncio.gather(*waiters)
+
+            # A clock stopped from another thread resumes the waiting coroutines
+            clock.initialise(3)
+            threading.Timer(0.01, clock.stop_clock).start()
+            await clock.wait_until_stopped_async()
+
+            # The clock has already stopped
+            await clock.wait_until_stopped_async()
+
+        asyncio.run(asyncio.wait_for(run(), timeout=5))
+        self.assertEqual(host.ticks, [0, 1, 2, 3])
+
+    def test_async_clock_threaded_start(self):
+        clock = AsyncClock()
+        host = DummyComputingHost("QPU_1", clock)
+        clock.attach_host(host)
+
+        clock.initialise(3)
+        clock.start()
+
+        self.assertEqual(host.ticks, [0, 1, 2, 3])
+        self.assertTrue(clock.has_stopped)
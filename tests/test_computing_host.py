@@ -0,0 +1,418 @@
+import json
+import unittest
+from unittest import mock
+
+import numpy as np
+from qunetsim.backends import EQSNBackend
+from qunetsim.components.network import Network
+from qunetsim.objects import Qubit
+
+from interlinq.components import Clock, ComputingHost, computing_host
+from interlinq.components.controller_host import NumpyEncoder
+from interlinq.objects import Operation
+from interlinq.utils import Constants
+from interlinq.utils.vqe_subroutines import CompiledHamiltonian
+
+
+class TestComputingHost(unittest.TestCase):
+
+    # Runs before all tests
+    @classmethod
+    def setUpClass(cls) -> None:
+        pass
+
+    # Runs after all tests
+    @classmethod
+    def tearDownClass(cls) -> None:
+        pass
+
+    def setUp(self):
+        network = Network.get_instance()
+        network.start(["QPU_1"], EQSNBackend())
+
+        self.clock = Clock()
+        self.computing_host = ComputingHost(
+            host_id="QPU_1",
+            controller_host_id="host_1",
+            total_qubits=2,
+            clock=self.clock)
+        network.add_host(self.computing_host)
+
+        self._network = network
+
+    def tearDown(self):
+        # The measured qubits cannot be released, so the host is stopped
+        # before the network stops the backend
+        self.computing_host.stop(release_qubits=False)
+        self._network.remove_host(self.computing_host)
+        self._network.stop()
+
+    def _operation(self, layer_end, **kwargs):
+        op = Operation(computing_host_ids=["QPU_1"], **kwargs).get_dict()
+        op["layer_end"] = layer_end
+        return op
+
+    def _load_schedule(self, ops):
+        self.computing_host._load_schedule(json.dumps(ops))
+
+    def test_compile_schedule(self):
+        self._load_schedule([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1"]),
+            self._operation(1, name=Constants.SINGLE, qids=["q_1"], gate=Operation.X),
+            self._operation(1, name=Constants.SINGLE, qids=["q_1"], gate=Operation.RY,
+                            gate_param=np.pi),
+        ])
+
+        schedule = self.computing_host._schedule
+        self.assertEqual(list(schedule.keys()), [0, 1])
+        self.assertIsNone(self.computing_host._error_message)
+
+        handler, async_handler, args = schedule[0][0]
+        self.assertEqual(handler, self.computing_host._prepare_qubits)
+        self.assertIsNone(async_handler)
+
+        _, _, args = schedule[1][0]
+        self.assertEqual(args[1:], (Qubit.X, ()))
+
+        # The rotation is applied as its memoised unitary
+        _, _, args = schedule[1][1]
+        self.assertEqual(args[1], Qubit.custom_gate)
+        self.assertIs(args[2][0], ComputingHost.rotation_matrix(Operation.RY, np.pi))
+
+    def test_compile_error(self):
+        self._load_schedule([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1"]),
+            dict(Operation(name=Constants.SEND_ENT, qids=["e_1"],
+                           computing_host_ids=["QPU_1", "QPU_2"],
+                           pre_allocated_qubits=True).get_dict(), layer_end=1),
+            self._operation(2, name=Constants.SINGLE, qids=["q_1"], gate="unsupported"),
+        ])
+
+        # Nothing of a rejected schedule is performed or shared in advance
+        self.assertIn("Unsupported gate unsupported", self.computing_host._error_message)
+        self.assertEqual(self.computing_host._schedule, {})
+        self.assertEqual(self.computing_host._epr_pairs, {})
+        self.assertEqual(self.computing_host._upcoming_epr_pairs, {})
+
+    def test_extract_gate_param(self):
+        matrix = np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]])
+        op = self._operation(1, name=Constants.SINGLE, qids=["q_1"], gate=Operation.CUSTOM,
+                             gate_param=matrix)
+        op = json.loads(json.dumps(op, cls=NumpyEncoder))
+        encoded = json.dumps(op["gate_param"])
+
+        gate_param = ComputingHost.extract_gate_param(op)
+        np.testing.assert_allclose(gate_param, matrix)
+        self.assertEqual(json.dumps(op["gate_param"]), encoded)
+
+        # The operations with the same matrix share the decoded array
+        self.assertIs(ComputingHost.extract_gate_param(json.loads(json.dumps(op))),
+                      gate_param)
+        self.assertFalse(gate_param.flags.writeable)
+
+        # Entries which are not complex pairs are decoded as real numbers
+        op["gate_param"] = [[0, 1.0], [[1.0, 0.0], 0]]
+        np.testing.assert_allclose(ComputingHost.extract_gate_param(op), [[0, 1], [1, 0]])
+
+    def test_rotation_matrix(self):
+        cache = computing_host.ROTATION_MATRICES
+        cache.clear()
+
+        self._load_schedule([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1", "q_2"]),
+            self._operation(1, name=Constants.SINGLE, qids=["q_1"], gate=Operation.RY,
+                            gate_param=np.pi / 2),
+            self._operation(1, name=Constants.SINGLE, qids=["q_2"], gate=Operation.RY,
+                            gate_param=np.pi / 2),
+            self._operation(2, name=Constants.SINGLE, qids=["q_1"], gate=Operation.RX,
+                            gate_param=np.pi),
+        ])
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+        np.testing.assert_allclose(
+            ComputingHost.rotation_matrix(Operation.RZ, np.pi),
+            [[-1j, 0], [0, 1j]], atol=1e-12)
+        np.testing.assert_allclose(
+            ComputingHost.rotation_matrix(Operation.RY, np.pi / 2),
+            np.array([[1, -1], [1, 1]]) / np.sqrt(2))
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+
+    def test_perform_custom_gate(self):
+        op = self._operation(1, name=Constants.SINGLE, qids=["q_1"], gate=Operation.CUSTOM,
+                             gate_param=np.array([[0, 1j], [1j, 0]]))
+        self._load_schedule(json.loads(json.dumps([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1"]),
+            op,
+            self._operation(2, name=Constants.MEASURE, qids=["q_1"], cids=["c_1"]),
+        ], cls=NumpyEncoder)))
+
+        for ticks in range(3):
+            self.computing_host.perform_schedule(ticks)
+
+        self.assertEqual(self.computing_host.bits, {"c_1": 1})
+
+    def test_validate_schedule(self):
+        self._load_schedule([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1", "q_2"]),
+            self._operation(1, name=Constants.SINGLE, qids=["q_1", "q_2"],
+                            gate=Operation.X),
+        ])
+
+        self.assertEqual(self.computing_host._schedule, {})
+        self.assertIn("Number of qubit IDs", self.computing_host._error_message)
+
+        self._load_schedule([
+            self._operation(0, name=Constants.SEND_EXP),
+        ])
+        self.assertIn("list of observables", self.computing_host._error_message)
+
+        self._load_schedule([
+            self._operation(0, name=Constants.REC_HAMILTON,
+                            hamiltonian=[(1.0, [("Z", 0)])]),
+            self._operation(1, name=Constants.SEND_EXP),
+        ])
+        self.assertIsNone(self.computing_host._error_message)
+        self.assertEqual(list(self.computing_host._schedule.keys()), [0, 1])
+
+    def test_perform_schedule(self):
+        self._load_schedule([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1", "q_2"]),
+            self._operation(1, name=Constants.SINGLE, qids=["q_1"], gate=Operation.RX,
+                            gate_param=np.pi),
+            self._operation(2, name=Constants.TWO_QUBIT, qids=["q_1", "q_2"],
+                            gate=Operation.CNOT),
+            self._operation(3, name=Constants.MEASURE, qids=["q_1"], cids=["c_1"]),
+            self._operation(3, name=Constants.MEASURE, qids=["q_2"], cids=["c_2"]),
+        ])
+
+        for ticks in range(4):
+            self.computing_host.perform_schedule(ticks)
+
+        self.assertEqual(self.computing_host.bits, {"c_1": 1, "c_2": 1})
+
+    def test_expectation_value(self):
+        hamiltonian = CompiledHamiltonian([
+            (1.0, [("PauliZ", 0)]),
+            (0.5, [("PauliZ", 0), ("PauliZ", 1)]),
+            (2.0, [("PauliX", 1)]),
+        ])
+
+        # The compiled Hamiltonian is sent as its list of terms
+        self._load_schedule(json.loads(json.dumps([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1", "q_2"]),
+            self._operation(0, name=Constants.REC_HAMILTON, hamiltonian=hamiltonian),
+            self._operation(1, name=Constants.SINGLE, qids=["q_1"], gate=Operation.X),
+            self._operation(2, name=Constants.TWO_QUBIT, qids=["q_1", "q_2"],
+                            gate=Operation.CNOT),
+            self._operation(3, name=Constants.SEND_EXP),
+        ], cls=NumpyEncoder)))
+
+        for ticks in range(4):
+            self.computing_host.perform_schedule(ticks)
+
+        self.assertIsInstance(self.computing_host.assigned_hamiltonian, CompiledHamiltonian)
+        self.assertAlmostEqual(np.real(self.computing_host.exp), -0.5)
+
+        # The expectation value of the last run does not count for the next one
+        self._load_schedule([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1"]),
+        ])
+        self.computing_host.perform_schedule(0)
+        self.computing_host._check_results("expectation")
+        self.assertEqual(
+            json.loads(self.computing_host._get_results_message("expectation"))["QPU_1"]["type"],
+            "error")
+
+    def test_bind_parameters(self):
+        theta = {"parameter": "theta", "value": np.pi}
+        self._load_schedule([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1"]),
+            self._operation(1, name=Constants.SINGLE, qids=["q_1"], gate=Operation.RY,
+                            gate_param=theta),
+            self._operation(2, name=Constants.MEASURE, qids=["q_1"], cids=["c_1"]),
+        ])
+        schedule = self.computing_host._schedule
+
+        for ticks in range(3):
+            self.computing_host.perform_schedule(ticks)
+        self.assertEqual(self.computing_host.bits, {"c_1": 1})
+
+        # The held schedule is only patched with the new value of the parameter
+        self.computing_host._load_schedule(json.dumps(
+            {"type": "bind_parameters", "values": {"theta": 0.0}, "seed": 1}))
+        self.assertIs(self.computing_host._schedule, schedule)
+
+        for ticks in range(3):
+            self.computing_host.perform_schedule(ticks)
+        self.assertEqual(self.computing_host.bits, {"c_1": 0})
+
+        # A later run of the clock moves the held schedule along
+        self.computing_host._load_schedule(json.dumps(
+            {"type": "bind_parameters", "values": {"theta": np.pi}, "seed": 2, "offset": 3}))
+        self.assertEqual(sorted(self.computing_host._schedule), [3, 4, 5])
+
+        for ticks in range(3, 6):
+            self.computing_host.perform_schedule(ticks)
+        self.assertEqual(self.computing_host.bits, {"c_1": 1})
+
+    def test_complete_shot(self):
+        self._load_schedule([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1", "q_2"]),
+            self._operation(1, name=Constants.SINGLE, qids=["q_1"], gate=Operation.X),
+            self._operation(2, name=Constants.MEASURE, qids=["q_1"], cids=["c_1"]),
+        ])
+
+        for _ in range(3):
+            for ticks in range(3):
+                self.computing_host.perform_schedule(ticks)
+            self.assertEqual(self.computing_host.bits, {"c_1": 1})
+            self.assertEqual(self.computing_host._total_qubits, 1)
+
+            # The unmeasured qubit q_2 is released along with the measured bits
+            self.computing_host.complete_shot()
+            self.assertEqual(self.computing_host._qubits, {})
+            self.assertEqual(self.computing_host._bits, {})
+            self.assertEqual(self.computing_host._total_qubits, 2)
+
+        results = json.loads(self.computing_host._get_results_message("bits"))
+        self.assertEqual(results["QPU_1"], {
+            "type": "measurement_counts",
+            "shots": 3,
+            "val": {"c_1": {"0": 0, "1": 3}},
+            "counts": {"1": 3},
+            "bit_ids": ["c_1"],
+            "memory": ["1", "1", "1"],
+        })
+
+    def _sample_operation(self, layer_end, qubit_id, bit_id):
+        op = self._operation(layer_end, name=Constants.MEASURE, qids=[qubit_id],
+                             cids=[bit_id])
+        return dict(op, name=Constants.SAMPLE, shots=50, seed=7)
+
+    def test_sample_measurements(self):
+        self._load_schedule([
+            self._operation(0, name=Constants.PREPARE_QUBITS, qids=["q_1", "q_2"]),
+            self._operation(1, name=Constants.SINGLE, qids=["q_1"], gate=Operation.H),
+            self._operation(2, name=Constants.TWO_QUBIT, qids=["q_1", "q_2"],
+                            gate=Operation.CNOT),
+            self._sample_operation(3, "q_1", "c_1"),
+            self._sample_operation(3, "q_2", "c_2"),
+        ])
+
+        for ticks in range(4):
+            self.computing_host.perform_schedule(ticks)
+
+        # The qubits stay unmeasured until the shots are drawn
+        self.assertEqual(self.computing_host.bits, {})
+        self.computing_host._sample_measurements()
+
+        results = json.loads(self.computing_host._get_results_message("bits"))["QPU_1"]
+        self.assertEqual(results["shots"], 50)
+        self.assertEqual(results["bit_ids"], ["c_1", "c_2"])
+        self.assertEqual(len(results["memory"]), 50)
+        self.assertEqual(set(results["counts"]), {"00", "11"})
+        self.assertEqual(results["val"]["c_1"], results["val"]["c_2"])
+
+        # The sampled qubits are released when the next schedule arrives
+        self._load_schedule([])
+        self.assertEqual(self.computing_host._sampled_qubits, {})
+
+    def test_epr_timeout(self):
+        computing_host = ComputingHost(
+            host_id="QPU_2",
+            controller_host_id="host_1",
+            clock=self.clock,
+            epr_timeout=0.1)
+
+        operation = Operation(
+            name=Constants.REC_ENT,
+            qids=["q_1"],
+            computing_host_ids=["QPU_2", "QPU_1"],
+            pre_allocated_qubits=True).get_dict()
+        computing_host._process_rec_ent(operation)
+
+        self.assertIn("did not arrive within 0.1 seconds", computing_host._error_message)
+        self.assertNotIn("q_1", computing_host._pre_allocated_qubits)
+        self.assertTrue(self.clock._stop)
+
+    def _load_epr_schedule(self, computing_host, receiver_ids):
+        computing_host._load_schedule(json.dumps([
+            dict(Operation(name=Constants.SEND_ENT, qids=["e_" + str(layer_end)],
+                           computing_host_ids=[computing_host.host_id, receiver_id],
+                           pre_allocated_qubits=True).get_dict(), layer_end=layer_end)
+            for layer_end, receiver_id in enumerate(receiver_ids, start=1)
+        ]))
+
+    def test_epr_pool(self):
+        # Enough pre-allocated qubits for the depth of the pool to be the bound
+        self._load_epr_schedule(self.computing_host, ["QPU_2"] * 3)
+        self.computing_host._total_pre_allocated_qubits = 3
+
+        with mock.patch.object(self.computing_host, "send_epr") as send_epr:
+            self.computing_host._fill_epr_pool()
+            self.assertEqual(send_epr.call_count, 2)
+
+            self.assertTrue(self.computing_host._take_pooled_epr_pair("QPU_2", "e_1"))
+            self.assertFalse(self.computing_host._take_pooled_epr_pair("QPU_2", "e_3"))
+
+            # The pair taken by the operation is not shared in advance anymore
+            self.computing_host._fill_epr_pool()
+            self.assertEqual(send_epr.call_count, 2)
+
+        self.assertEqual(self.computing_host._epr_pool, {"QPU_2": {"e_2"}})
+
+    def test_epr_pool_after_acknowledgement(self):
+        operations = [
+            dict(Operation(name=Constants.SEND_ENT, qids=["e_1"],
+                           computing_host_ids=["QPU_1", "QPU_2"],
+                           pre_allocated_qubits=True).get_dict(), layer_end=1),
+        ]
+
+        # A schedule which another computing host may still reject shares no pairs
+        with mock.patch.object(self.computing_host, "send_epr") as send_epr, \
+                mock.patch.object(self.computing_host, "send_classical") as send_classical:
+            self.computing_host._accept_schedule(json.dumps(operations))
+            send_classical.assert_called_once_with("host_1", "ACK", await_ack=True)
+            self.assertEqual(send_epr.call_count, 0)
+
+            # The pairs are shared once the clock runs
+            self.computing_host.perform_schedule(0)
+            send_epr.assert_called_once_with("QPU_2", q_id="e_1")
+
+    def test_epr_pool_pre_allocated_qubits(self):
+        # Every pooled pair holds one of the two pre-allocated qubits, whatever
+        # the link it is shared on
+        computing_host = ComputingHost(
+            host_id="QPU_2",
+            controller_host_id="host_1",
+            total_pre_allocated_qubits=2,
+            clock=self.clock)
+        self._load_epr_schedule(computing_host, ["QPU_1", "QPU_3", "QPU_3"])
+
+        with mock.patch.object(computing_host, "send_epr") as send_epr:
+            computing_host._fill_epr_pool()
+            self.assertEqual(send_epr.call_count, 2)
+
+        self.assertEqual(computing_host._epr_pool, {"QPU_1": {"e_1"}, "QPU_3": {"e_2"}})
+
+    def test_stream_measurements(self):
+        computing_host = ComputingHost(
+            host_id="QPU_2",
+            controller_host_id="host_1",
+            total_qubits=1,
+            clock=self.clock,
+            stream_measurements=True)
+
+        qubit = Qubit(computing_host, q_id="q_1")
+        qubit.X()
+        computing_host._add_new_qubit(qubit, "q_1")
+
+        operation = Operation(name=Constants.MEASURE, qids=["q_1"], cids=["c_1"],
+                              computing_host_ids=["QPU_2"]).get_dict()
+
+        with mock.patch.object(computing_host, "send_classical") as send_classical:
+            computing_host._process_measurement(operation)
+            send_classical.assert_called_once_with("host_1", json.dumps([0, 0, "c_1", 1]))
+
+        results = json.loads(computing_host._get_results_message("bits"))
+        self.assertEqual(results["QPU_2"]["streamed_records"], 1)
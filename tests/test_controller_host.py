@@ -1,12 +1,18 @@
+import json
+import threading
 import unittest
+from unittest import mock
 
+import numpy as np
 from qunetsim.backends import EQSNBackend
 from qunetsim.components.network import Network
+from qunetsim.objects import Message
 
-from interlinq.components import ControllerHost
-from interlinq.objects import Operation
+from interlinq.components import Clock, ComputingHost, ControllerHost
+from interlinq.objects import Operation, Parameter, Qubit
 from interlinq.objects.circuit import Circuit
 from interlinq.objects.layer import Layer
+from interlinq.utils import Constants
 
 
 class TestControllerHost(unittest.TestCase):
@@ -33,7 +39,8 @@ class TestControllerHost(unittest.TestCase):
         self._network = network
 
     def tearDown(self):
-        self._network.stop(True)
+        self._network.remove_host(self.controller_host)
+        self._network.stop()
 
     def test_instantiation(self):
         self.assertEqual(self.controller_host.host_id, "host_1")
@@ -44,6 +51,253 @@ class TestControllerHost(unittest.TestCase):
         self.assertEqual(self.controller_host.computing_host_ids, ["QPU_1", "QPU_2"])
         self.assertEqual(self.controller_host._get_operation_execution_time("QPU_1", "REC_ENT", None), 1)
 
+    def test_rejected_schedule(self):
+        clock = Clock()
+        controller_host = ControllerHost(host_id="host_2", clock=clock)
+
+        replies = [Message("QPU_1", "ACK", 0), Message("QPU_2", "ACK", 0)]
+        self.assertTrue(controller_host._schedules_accepted(replies))
+        self.assertFalse(clock.has_stopped)
+
+        replies[1] = Message("QPU_2", Constants.SCHEDULE_REJECTED, 0)
+        self.assertFalse(controller_host._schedules_accepted(replies))
+        self.assertTrue(clock.has_stopped)
+
+    def test_clock_injection(self):
+        self.assertIs(self.controller_host.clock, Clock.get_instance())
+
+        clock = Clock()
+        controller_host = ControllerHost(host_id="host_2", clock=clock)
+        computing_hosts, q_map = controller_host.create_distributed_network(
+            num_computing_hosts=2, num_qubits_per_host=1, id_prefix="SWEEP_QPU_")
+
+        self.assertIs(controller_host.clock, clock)
+        self.assertEqual(list(q_map.keys()), ["SWEEP_QPU_0", "SWEEP_QPU_1"])
+        for computing_host in computing_hosts:
+            self.assertIs(computing_host.clock, clock)
+            computing_host.stop()
+
+    def test_measurement_records(self):
+        self.controller_host.connect_host("QPU_2")
+
+        # The records of QPU_1 arrive on both sides of its final results
+        messages = [
+            Message("QPU_1", json.dumps([0, 1, "c_1", 1]), 0),
+            Message("QPU_1", json.dumps({"QPU_1": {"type": "measurement_result",
+                                                   "val": {"c_1": 1, "c_2": 0},
+                                                   "streamed_records": 2}}), 1),
+            Message("QPU_1", json.dumps([0, 3, "c_2", 0]), 2),
+            Message("QPU_2", "ACK", 0),
+            Message("QPU_2", json.dumps({"QPU_2": {"type": "measurement_result",
+                                                   "val": {}}}), 1),
+        ]
+        for message in messages:
+            self.controller_host._classical_messages.add_msg_to_storage(message)
+        self.controller_host._schedules_delivered.set()
+
+        records = []
+        self.controller_host.receive_results(
+            on_record=lambda host_id, record: records.append((host_id, record)))
+
+        self.assertEqual(records, [("QPU_1", [0, 1, "c_1", 1]), ("QPU_1", [0, 3, "c_2", 0])])
+        self.assertEqual(self.controller_host.results, {
+            "QPU_1": {"type": "measurement_result", "val": {"c_1": 1, "c_2": 0}},
+            "QPU_2": {"type": "measurement_result", "val": {}},
+        })
+
+    def test_malformed_results(self):
+        self.controller_host.connect_host("QPU_2")
+
+        # Results are only read once the schedules are delivered
+        with self.assertRaises(RuntimeError):
+            list(self.controller_host.measurement_records(timeout=0.01))
+
+        # The results of QPU_2 lack its own key
+        messages = [
+            Message("QPU_1", json.dumps({"QPU_1": {"type": "measurement_result",
+                                                   "val": {"c_1": 1}}}), 0),
+            Message("QPU_2", json.dumps({"QPU_1": {"type": "measurement_result",
+                                                   "val": {}}}), 0),
+        ]
+        for message in messages:
+            self.controller_host._classical_messages.add_msg_to_storage(message)
+        self.controller_host._schedules_delivered.set()
+
+        self.controller_host.receive_results()
+
+        results = self.controller_host.results
+        self.assertEqual(results["QPU_1"], {"type": "measurement_result", "val": {"c_1": 1}})
+        self.assertEqual(results["QPU_2"]["type"], "error")
+        self.assertIn("Unexpected results message from QPU_2", results["QPU_2"]["message"])
+
+    def _run_bell_circuit(self, controller_host_protocol, classical_ctrl=False,
+                          **network_kwargs):
+        self._network.delay = 0
+        controller_host = ControllerHost(host_id="host_2", clock=Clock())
+        computing_hosts, q_map = controller_host.create_distributed_network(
+            num_computing_hosts=2, num_qubits_per_host=2, id_prefix="BELL_QPU_",
+            **network_kwargs)
+        controller_host.start()
+
+        hosts = computing_hosts + [controller_host]
+        self._network.add_hosts(hosts)
+
+        q_1 = Qubit(computing_host_id="BELL_QPU_0", q_id=q_map["BELL_QPU_0"][0])
+        q_2 = Qubit(computing_host_id="BELL_QPU_1", q_id=q_map["BELL_QPU_1"][0])
+        q_1.single(gate=Operation.H)
+        q_1.two_qubit(gate=Operation.CNOT, target_qubit=q_2)
+        qubits = [q_1, q_2]
+
+        # A gate controlled by a bit which is always 0, so that the measurements
+        # are not all terminal
+        if classical_ctrl:
+            q_3 = Qubit(computing_host_id="BELL_QPU_1", q_id=q_map["BELL_QPU_1"][1])
+            q_3.measure(bit_id="flag")
+            q_2.classical_ctrl_gate(gate=Operation.X, bit_id="flag")
+            qubits.append(q_3)
+
+        q_1.measure(bit_id=q_1.q_id)
+        q_2.measure(bit_id=q_2.q_id)
+        circuit = Circuit(q_map, qubits=qubits)
+
+        def computing_host_protocol(host):
+            host.receive_schedule()
+            host.send_results()
+
+        try:
+            threads = [controller_host.run_protocol(
+                controller_host_protocol, arguments=(circuit,))]
+            for computing_host in computing_hosts:
+                threads.append(computing_host.run_protocol(computing_host_protocol))
+            for thread in threads:
+                thread.join()
+        finally:
+            for host in hosts:
+                host.stop(release_qubits=False)
+                self._network.remove_host(host)
+
+        return controller_host, computing_hosts
+
+    def test_multi_shot_counts(self):
+        def controller_host_protocol(host, circuit):
+            host.generate_and_send_schedules(circuit, shots=20)
+            host.receive_results()
+
+        controller_host, computing_hosts = self._run_bell_circuit(
+            controller_host_protocol, classical_ctrl=True)
+
+        for host_id in ["BELL_QPU_0", "BELL_QPU_1"]:
+            self.assertEqual(controller_host.results[host_id]["type"], "measurement_counts")
+            self.assertEqual(controller_host.results[host_id]["shots"], 20)
+
+        # No EPR pair is shared in advance for a shot after the last one
+        for computing_host, other_host in zip(computing_hosts, reversed(computing_hosts)):
+            self.assertEqual(computing_host.get_epr_pairs(other_host.host_id), [])
+
+        # The bits of the Bell pair are only correlated in the joint counts
+        self.assertEqual(controller_host.count_bit_ids, ["q_0_0", "flag", "q_1_0"])
+        self.assertEqual(sum(controller_host.counts.values()), 20)
+        self.assertTrue(set(controller_host.counts) <= {"000", "101"})
+
+        bit_counts = controller_host.bit_counts
+        self.assertEqual(bit_counts["q_0_0"], bit_counts["q_1_0"])
+        self.assertEqual(bit_counts["flag"], {"0": 20, "1": 0})
+
+    def test_sampled_shots(self):
+        def controller_host_protocol(host, circuit):
+            host.generate_and_send_schedules(circuit, shots=500)
+            host.receive_results()
+
+        controller_host, computing_hosts = self._run_bell_circuit(controller_host_protocol)
+
+        # The terminal measurements are sampled from a single run of the schedules
+        for computing_host in computing_hosts:
+            names = [handler for ops in computing_host._schedule.values()
+                     for handler, _, _ in ops]
+            self.assertIn(computing_host._process_sample, names)
+            self.assertNotIn(computing_host.host_id + "_0", computing_host._bits)
+
+        self.assertEqual(controller_host.count_bit_ids, ["q_0_0", "q_1_0"])
+        self.assertEqual(set(controller_host.counts), {"00", "11"})
+        self.assertEqual(sum(controller_host.counts.values()), 500)
+        self.assertEqual(len(controller_host.results["BELL_QPU_0"]["memory"]), 500)
+
+    def test_rebind_parameters(self):
+        self._network.delay = 0
+        controller_host = ControllerHost(host_id="host_2", clock=Clock())
+        computing_hosts, q_map = controller_host.create_distributed_network(
+            num_computing_hosts=2, num_qubits_per_host=1, id_prefix="BIND_QPU_")
+        controller_host.start()
+
+        hosts = computing_hosts + [controller_host]
+        self._network.add_hosts(hosts)
+
+        q_1 = Qubit(computing_host_id="BIND_QPU_0", q_id=q_map["BIND_QPU_0"][0])
+        q_2 = Qubit(computing_host_id="BIND_QPU_1", q_id=q_map["BIND_QPU_1"][0])
+        q_1.single(gate=Operation.RY, gate_param=Parameter("theta"))
+        q_1.two_qubit(gate=Operation.CNOT, target_qubit=q_2)
+        q_1.measure(bit_id=q_1.q_id)
+        q_2.measure(bit_id=q_2.q_id)
+        circuit = Circuit(q_map, qubits=[q_1, q_2])
+
+        angles = [0.0, np.pi, 0.0, np.pi]
+        results = []
+
+        def controller_host_protocol(host):
+            for theta in angles:
+                host.generate_and_send_schedules(circuit, parameters={"theta": theta})
+                host.receive_results()
+                results.append(host.results)
+
+        def computing_host_protocol(host):
+            for _ in angles:
+                host.receive_schedule()
+                host.send_results()
+
+        try:
+            threads = [controller_host.run_protocol(controller_host_protocol)]
+            for computing_host in computing_hosts:
+                threads.append(computing_host.run_protocol(computing_host_protocol))
+            for thread in threads:
+                thread.join()
+        finally:
+            for host in hosts:
+                host.stop(release_qubits=False)
+                self._network.remove_host(host)
+
+        # Every run after the first one only sends the values of the parameters,
+        # and starts from fresh registers
+        self.assertEqual(len(controller_host._schedule_cache), 1)
+        for theta, result in zip(angles, results):
+            bit = int(round(theta / np.pi))
+            self.assertEqual(result, {
+                "BIND_QPU_0": {"type": "measurement_result", "val": {"q_0_0": bit}},
+                "BIND_QPU_1": {"type": "measurement_result", "val": {"q_1_0": bit}},
+            })
+
+    def test_stream_measurements(self):
+        records = []
+
+        def read_records(host):
+            records.extend(host.measurement_records())
+
+        # The records are read on another thread while the schedules are run
+        def controller_host_protocol(host, circuit):
+            reader = threading.Thread(target=read_records, args=(host,))
+            reader.start()
+            host.generate_and_send_schedules(circuit)
+            reader.join()
+
+        controller_host, _ = self._run_bell_circuit(
+            controller_host_protocol, stream_measurements=True)
+
+        # Only the bits of the circuit are streamed, not the ones of the EPR pairs
+        self.assertEqual(sorted((host_id, record[2]) for host_id, record in records),
+                         [("BELL_QPU_0", "q_0_0"), ("BELL_QPU_1", "q_1_0")])
+        for host_id, (shot, _, bit_id, bit) in records:
+            self.assertEqual(shot, 0)
+            self.assertEqual(controller_host.results[host_id]["val"], {bit_id: bit})
+
     def test_distributed_scheduler(self):
         self.controller_host.connect_host("QPU_2")
 
@@ -114,7 +368,7 @@ class TestControllerHost(unittest.TestCase):
         layers = [layer_1, layer_2, layer_3, layer_4, layer_5]
         circuit = Circuit(q_map, layers)
 
-        computing_host_schedules, max_execution_time = self.controller_host._create_distributed_schedules(circuit)
+        computing_host_schedules, max_execution_time, _ = self.controller_host._create_distributed_schedules(circuit)
 
         self.assertEqual(len(computing_host_schedules), 2)
         self.assertEqual(len(computing_host_schedules['QPU_1']), 4)
@@ -140,6 +394,293 @@ class TestControllerHost(unittest.TestCase):
         self.assertEqual(computing_host_schedules['QPU_2'][3]['name'], "SEND_CLASSICAL")
         self.assertEqual(computing_host_schedules['QPU_2'][3]['layer_end'], 3)
 
+    def test_schedule_expectation_terms(self):
+        z_terms = [(1.0, [("PauliZ", 0), ("PauliZ", 1)]), (0.5, [("PauliZ", 0)]),
+                   (0.5, [("PauliZ", 1)])]
+        x_terms = [(0.2, [("PauliX", 0), ("PauliX", 1)]), (0.1, [("PauliX", 1)])]
+        y_terms = [(0.3, [("PauliY", 0), ("PauliY", 1)])]
+        hamiltonian = z_terms + x_terms + y_terms
+
+        q_map = {"QPU_1": ["q_0_0"], "QPU_2": ["q_1_0"]}
+        makespan = self.controller_host.schedule_expectation_terms(hamiltonian, q_map)
+        assignment = self.controller_host.term_assignment
+
+        # Each computing host receives whole qubit-wise commuting groups, the
+        # groups of the most work first
+        self.assertEqual(assignment["QPU_1"], x_terms)
+        self.assertEqual(assignment["QPU_2"], z_terms + y_terms)
+        self.assertEqual(makespan, 20)
+
+        # A computing host with a larger state is slower than evaluating every
+        # group on the other one
+        q_map = {"QPU_1": ["q_0_0", "q_0_1", "q_0_2"], "QPU_2": ["q_1_0"]}
+        makespan = self.controller_host.schedule_expectation_terms(hamiltonian, q_map)
+
+        self.assertEqual(assignment["QPU_1"], [])
+        self.assertEqual(assignment["QPU_2"], hamiltonian)
+        self.assertEqual(makespan, 32)
+
+        # The terms of the groups are kept in the order of the Hamiltonian
+        hamiltonian = [z_terms[0], x_terms[0], z_terms[1], y_terms[0], x_terms[1], z_terms[2]]
+        q_map = {"QPU_1": ["q_0_0"], "QPU_2": ["q_1_0"]}
+        self.controller_host.schedule_expectation_terms(hamiltonian, q_map)
+
+        self.assertEqual(assignment["QPU_1"], x_terms)
+        self.assertEqual(assignment["QPU_2"],
+                         [z_terms[0], z_terms[1], y_terms[0], z_terms[2]])
+
+    def _run_expectation_dispatch(self, controller_host_protocol, computing_host_protocol):
+        self._network.delay = 0
+        controller_host = ControllerHost(host_id="host_2", clock=Clock())
+        computing_hosts, q_map = controller_host.create_distributed_network(
+            num_computing_hosts=2, num_qubits_per_host=1, id_prefix="EXP_QPU_")
+        controller_host.start()
+
+        hosts = computing_hosts + [controller_host]
+        self._network.add_hosts(hosts)
+
+        # Every computing host holds the same state |1>
+        qubits = [Qubit(computing_host_id=host_id, q_id=q_map[host_id][0]) for host_id in q_map]
+        for qubit in qubits:
+            qubit.single(gate=Operation.X)
+        circuit = Circuit(q_map, qubits=qubits)
+
+        try:
+            threads = [controller_host.run_protocol(controller_host_protocol, arguments=(circuit,))]
+            for computing_host in computing_hosts:
+                threads.append(computing_host.run_protocol(computing_host_protocol))
+            for thread in threads:
+                thread.join()
+        finally:
+            for host in hosts:
+                host.stop(release_qubits=False)
+                self._network.remove_host(host)
+
+        return controller_host, q_map
+
+    def test_dispatch_expectation_terms(self):
+        hamiltonian = [(1.0, [("PauliZ", 0)]), (0.5, [("PauliX", 0)]),
+                       (0.25, [("PauliY", 0)]), (2.0, [])]
+        energy = []
+
+        def controller_host_protocol(host, circuit):
+            host.generate_and_send_schedules(circuit)
+            energy.append(host.dispatch_expectation_terms(hamiltonian))
+
+        def computing_host_protocol(host):
+            host.receive_schedule()
+            host.serve_expectation_terms()
+
+        controller_host, q_map = self._run_expectation_dispatch(
+            controller_host_protocol, computing_host_protocol)
+
+        self.assertAlmostEqual(energy[0], 1.0)
+
+        # Every group of terms is evaluated once, by whichever host was free
+        assigned_terms = [term for host_id in q_map
+                          for term in controller_host.term_assignment[host_id]]
+        self.assertEqual(sorted(assigned_terms, key=str), sorted(hamiltonian, key=str))
+
+        self.assertEqual(set(controller_host.host_utilisation), set(q_map))
+        for utilisation in controller_host.host_utilisation.values():
+            self.assertTrue(0 <= utilisation <= 1)
+
+    def test_dispatch_to_silent_host(self):
+        hamiltonian = [(1.0, [("PauliZ", 0)]), (0.5, [("PauliX", 0)]),
+                       (0.25, [("PauliY", 0)]), (2.0, [])]
+        energy = []
+
+        def controller_host_protocol(host, circuit):
+            host.generate_and_send_schedules(circuit)
+            energy.append(host.dispatch_expectation_terms(hamiltonian, timeout=0.5))
+
+        # EXP_QPU_0 never answers its chunks
+        def computing_host_protocol(host):
+            host.receive_schedule()
+            if host.host_id == "EXP_QPU_1":
+                host.serve_expectation_terms()
+                return
+
+            content = {}
+            while content.get("type") != "expectation_done":
+                msg = host.get_next_classical(host.controller_host_id, wait=-1)
+                if msg.content != "ACK":
+                    content = json.loads(msg.content)
+
+        controller_host, _ = self._run_expectation_dispatch(
+            controller_host_protocol, computing_host_protocol)
+
+        # The chunk of the silent host is evaluated by the other one
+        self.assertAlmostEqual(energy[0], 1.0)
+        self.assertEqual(controller_host.term_assignment["EXP_QPU_0"], [])
+        self.assertEqual(sorted(controller_host.term_assignment["EXP_QPU_1"], key=str),
+                         sorted(hamiltonian, key=str))
+
+    def test_dispatch_failed_chunks(self):
+        # The terms act on more qubits than the computing hosts hold
+        hamiltonian = [(1.0, [("PauliZ", 1)])]
+        errors = []
+
+        def controller_host_protocol(host, circuit):
+            host.generate_and_send_schedules(circuit)
+            try:
+                host.dispatch_expectation_terms(hamiltonian)
+            except RuntimeError as error:
+                errors.append(str(error))
+
+        def computing_host_protocol(host):
+            host.receive_schedule()
+            host.serve_expectation_terms()
+
+        self._run_expectation_dispatch(controller_host_protocol, computing_host_protocol)
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn("could not be evaluated", errors[0])
+
+    def _run_vqe_session(self, ansatz, parameters):
+        self._network.delay = 0
+        controller_host = ControllerHost(host_id="host_2", clock=Clock())
+        computing_hosts, q_map = controller_host.create_distributed_network(
+            num_computing_hosts=2, num_qubits_per_host=1, id_prefix="VQE_QPU_")
+        controller_host.start()
+
+        hosts = computing_hosts + [controller_host]
+        self._network.add_hosts(hosts)
+
+        hamiltonian = [(1.0, [("PauliZ", 0)]), (0.5, [("PauliX", 0)])]
+        energies = []
+
+        def controller_host_protocol(host):
+            with host.vqe_session(hamiltonian, ansatz, q_map) as session:
+                for values in parameters:
+                    energies.append(session.energy(values))
+                energies.append(session.iterations)
+
+        try:
+            threads = [controller_host.run_protocol(controller_host_protocol)]
+            for computing_host in computing_hosts:
+                threads.append(computing_host.run_protocol(ComputingHost.serve_vqe_session))
+            for thread in threads:
+                thread.join()
+        finally:
+            for host in hosts:
+                host.stop(release_qubits=False)
+                self._network.remove_host(host)
+
+        # The terms were shipped once, and kept by the computing hosts
+        self.assertEqual(sorted(len(host.assigned_hamiltonian) for host in computing_hosts),
+                         [1, 1])
+        self.assertEqual(energies[-1], len(parameters))
+
+        return controller_host, energies[:-1]
+
+    def test_vqe_session(self):
+        def ansatz(q_map, parameters):
+            qubits = [Qubit(computing_host_id=host_id, q_id=q_map[host_id][0])
+                      for host_id in q_map]
+            for qubit in qubits:
+                qubit.single(gate=Operation.RY, gate_param=parameters[0])
+            return Circuit(q_map, qubits=qubits)
+
+        angles = [0.0, np.pi / 3, np.pi]
+        _, energies = self._run_vqe_session(ansatz, [np.array([theta]) for theta in angles])
+
+        expected = [np.cos(theta) + 0.5 * np.sin(theta) for theta in angles]
+        np.testing.assert_allclose(energies, expected, atol=1e-6)
+
+    def test_parametric_vqe_session(self):
+        def ansatz(q_map, parameters):
+            qubits = [Qubit(computing_host_id=host_id, q_id=q_map[host_id][0])
+                      for host_id in q_map]
+            for qubit in qubits:
+                qubit.single(gate=Operation.RY, gate_param=Parameter("theta"))
+            return Circuit(q_map, qubits=qubits)
+
+        angles = [0.0, np.pi / 3, np.pi]
+        with mock.patch.object(ControllerHost, "_compile_schedules",
+                               autospec=True,
+                               side_effect=ControllerHost._compile_schedules) as compile_schedules:
+            controller_host, energies = self._run_vqe_session(
+                ansatz, [{"theta": theta} for theta in angles])
+
+        expected = [np.cos(theta) + 0.5 * np.sin(theta) for theta in angles]
+        np.testing.assert_allclose(energies, expected, atol=1e-6)
+
+        # The schedules are compiled and delivered once, and only bound afterwards
+        self.assertEqual(compile_schedules.call_count, 1)
+        self.assertEqual(len(controller_host._schedule_cache), 1)
+
+    def test_hoist_epr_pairs(self):
+        self.controller_host.connect_host("QPU_2")
+
+        def epr_pair(qubit_id):
+            return [
+                Operation(name=Constants.SEND_ENT, qids=[qubit_id],
+                          computing_host_ids=["QPU_1", "QPU_2"], pre_allocated_qubits=True),
+                Operation(name=Constants.REC_ENT, qids=[qubit_id],
+                          computing_host_ids=["QPU_2", "QPU_1"], pre_allocated_qubits=True),
+            ]
+
+        def measure(qubit_id):
+            return [
+                Operation(name=Constants.MEASURE, qids=[qubit_id], cids=[qubit_id],
+                          computing_host_ids=[computing_host_id])
+                for computing_host_id in ["QPU_1", "QPU_2"]
+            ]
+
+        q_map = {'QPU_1': ['qubit_1'], 'QPU_2': ['qubit_2']}
+        layers = [
+            Layer([Operation(name=Constants.SINGLE, qids=["qubit_1"], gate=Operation.X,
+                             computing_host_ids=["QPU_1"]),
+                   Operation(name=Constants.SINGLE, qids=["qubit_2"], gate=Operation.X,
+                             computing_host_ids=["QPU_2"])]),
+            Layer([Operation(name=Constants.SINGLE, qids=["qubit_1"], gate=Operation.H,
+                             computing_host_ids=["QPU_1"])]),
+            Layer(epr_pair("epr_1")),
+            Layer(measure("epr_1")),
+            Layer(epr_pair("epr_2")),
+            Layer(measure("epr_2")),
+        ]
+        circuit = Circuit(q_map, layers)
+
+        computing_host_schedules, max_execution_time, makespan_reduction = \
+            self.controller_host._create_distributed_schedules(circuit)
+
+        # The first pair moves to the first layer. The second pair stays, since
+        # the only pre-allocated qubit holds the first pair until it is measured
+        self.assertEqual(max_execution_time, 5)
+        self.assertEqual(makespan_reduction, 1)
+        self.assertEqual(len(circuit.layers), 6)
+
+        schedule = [(op['name'], op['layer_end']) for op in computing_host_schedules['QPU_2']]
+        self.assertEqual(schedule, [("SINGLE", 0), ("REC_ENT", 0), ("MEASURE", 2),
+                                    ("REC_ENT", 3), ("MEASURE", 4)])
+
+        # Without a free pre-allocated qubit no pair is moved
+        self.controller_host._pre_allocated_qubits["QPU_1"] = 0
+        _, max_execution_time, makespan_reduction = \
+            self.controller_host._create_distributed_schedules(circuit)
+        self.assertEqual(max_execution_time, 6)
+        self.assertEqual(makespan_reduction, 0)
+
+        # A pair received a layer after it is sent is not moved
+        self.controller_host._pre_allocated_qubits["QPU_1"] = 1
+        send_ent, rec_ent = epr_pair("epr_3")
+        circuit = Circuit(q_map, [
+            Layer([Operation(name=Constants.SINGLE, qids=["qubit_1"], gate=Operation.H,
+                             computing_host_ids=["QPU_1"])]),
+            Layer([send_ent]),
+            Layer([rec_ent]),
+            Layer(measure("epr_3")),
+        ])
+
+        computing_host_schedules, _, makespan_reduction = \
+            self.controller_host._create_distributed_schedules(circuit)
+        self.assertEqual(makespan_reduction, 0)
+
+        schedule = [(op['name'], op['layer_end']) for op in computing_host_schedules['QPU_2']]
+        self.assertEqual(schedule, [("REC_ENT", 2), ("MEASURE", 3)])
+
     def test_monolithic_to_distributed_circuit_algorithm_1(self):
         self.controller_host.connect_host("QPU_2")
 
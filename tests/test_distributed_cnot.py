@@ -67,7 +67,17 @@ class TestDistributedCnot(unittest.TestCase):
         self.clock = Clock.get_instance()
 
     def tearDown(self):
-        self.network.stop(True)
+        # The measured qubits cannot be released, so the hosts are stopped
+        # before the network stops the backend
+        hosts = [
+            self.controller_host,
+            self.computing_host_1,
+            self.computing_host_2,
+            self.computing_host_3]
+        for host in hosts:
+            host.stop(release_qubits=False)
+            self.network.remove_host(host)
+        self.network.stop()
 
     @unittest.skip("")
     def test_cnot_1(self):
@@ -377,7 +387,9 @@ class TestDistributedCnot(unittest.TestCase):
             self.computing_host_3.run_protocol(computing_host_protocol)
             time.sleep(20)
 
-        self.assertEqual(self.clock._maximum_ticks, 23)
+        # The EPR pair of the second CNOT is generated a layer earlier
+        self.assertEqual(self.controller_host.makespan_reduction, 1)
+        self.assertEqual(self.clock._maximum_ticks, 22)
 
         self.assertEqual(self.computing_host_1._bits['q_1'], 1)
         self.assertEqual(self.computing_host_2._bits['q_2'], 1)
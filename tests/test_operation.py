@@ -1,5 +1,6 @@
 import unittest
-from interlinq.objects import Operation
+from interlinq.objects import Operation, Parameter
+from interlinq.objects.operation import InputError
 
 
 class TestOperation(unittest.TestCase):
@@ -35,3 +36,23 @@ class TestOperation(unittest.TestCase):
         self.assertEqual(self.operation.gate, Operation.X)
         self.assertEqual(self.operation.computing_host_ids, ["QPU_1"])
         self.assertEqual(self.operation.get_dict(), self._op_info)
+
+    def test_symbolic_parameter(self):
+        theta = Parameter("theta")
+        operation = Operation(
+            name="SINGLE",
+            qids=["qubit_1"],
+            gate=Operation.RY,
+            gate_param=theta,
+            computing_host_ids=["QPU_1"])
+
+        self.assertEqual(operation.gate_param, Parameter("theta"))
+
+        # Only the rotation gates take a symbolic parameter
+        with self.assertRaises(InputError):
+            Operation(
+                name="SINGLE",
+                qids=["qubit_1"],
+                gate=Operation.CUSTOM,
+                gate_param=theta,
+                computing_host_ids=["QPU_1"])
@@ -0,0 +1,117 @@
+import unittest
+
+import numpy as np
+
+from interlinq.utils.vqe_subroutines import (
+    CompiledHamiltonian,
+    expectation_value,
+    qubit_wise_commuting_groups,
+    string_to_qutip_pauli,
+    tensor_product_matrix_list,
+)
+
+
+PAULIS = ["Identity", "PauliX", "PauliY", "PauliZ"]
+
+
+def dense_expectation_value(terms, vector, number_of_qubits):
+    total = 0
+
+    for coefficient, observables in terms:
+        matrices = [np.eye(2)] * number_of_qubits
+        for pauli, index in observables:
+            matrices[index] = string_to_qutip_pauli(pauli)
+
+        total += coefficient * np.vdot(vector, tensor_product_matrix_list(matrices) @ vector)
+
+    return total
+
+
+class TestVQESubroutines(unittest.TestCase):
+
+    def setUp(self):
+        self._rng = np.random.default_rng(1)
+
+    def _random_state(self, number_of_qubits):
+        vector = (self._rng.normal(size=2 ** number_of_qubits)
+                  + 1j * self._rng.normal(size=2 ** number_of_qubits))
+        return vector / np.linalg.norm(vector)
+
+    def test_single_qubit_paulis(self):
+        vector = np.array([1, 1j]) / np.sqrt(2)
+
+        for pauli, expected in zip(PAULIS, [1, 0, 1, 0]):
+            value = expectation_value([(1.0, [(pauli, 0)])], vector, 1)
+            self.assertAlmostEqual(value, expected)
+
+    def test_matches_dense_evaluation(self):
+        for number_of_qubits in range(1, 6):
+            vector = self._random_state(number_of_qubits)
+
+            terms = []
+            for _ in range(10):
+                indices = self._rng.choice(
+                    number_of_qubits, size=self._rng.integers(number_of_qubits + 1),
+                    replace=False)
+                observables = [(PAULIS[self._rng.integers(4)], int(index))
+                               for index in indices]
+                terms.append((float(self._rng.normal()), observables))
+
+            np.testing.assert_allclose(
+                expectation_value(terms, vector, number_of_qubits),
+                dense_expectation_value(terms, vector, number_of_qubits),
+                atol=1e-12)
+
+    def test_identity_term(self):
+        vector = self._random_state(3)
+        self.assertAlmostEqual(expectation_value([(0.5, [])], vector, 3), 0.5)
+
+    def test_many_qubits(self):
+        # The dense observable of 20 qubits would not fit in memory
+        vector = np.zeros(2 ** 20)
+        vector[0] = 1
+
+        terms = [(1.0, [("PauliZ", 0), ("PauliZ", 19)]), (2.0, [("PauliX", 3)])]
+        self.assertAlmostEqual(expectation_value(terms, vector, 20), 1.0)
+
+    def test_compiled_hamiltonian(self):
+        hamiltonian = CompiledHamiltonian([
+            (0.5, [("PauliX", 0), ("PauliY", 2)]),
+            (-1.0, [("PauliZ", 1)]),
+        ])
+
+        self.assertEqual(len(hamiltonian), 2)
+        self.assertEqual(hamiltonian.x_masks.tolist(), [0b101, 0])
+        self.assertEqual(hamiltonian.z_masks.tolist(), [0b100, 0b010])
+
+        with self.assertRaises(ValueError):
+            hamiltonian.expectation_value(self._random_state(2))
+
+    def test_compiled_hamiltonian_many_terms(self):
+        # The diagonal terms outnumber the qubits, and are summed at once
+        number_of_qubits = 4
+        vector = self._random_state(number_of_qubits)
+
+        terms = [(float(self._rng.normal()),
+                  [(PAULIS[self._rng.integers(4)], index) for index in range(number_of_qubits)])
+                 for _ in range(200)]
+        terms += [(1.0, [("PauliZ", index) for index in range(z)]) for z in range(5)]
+
+        np.testing.assert_allclose(
+            CompiledHamiltonian(terms).expectation_value(vector),
+            dense_expectation_value(terms, vector, number_of_qubits),
+            atol=1e-10)
+
+    def test_qubit_wise_commuting_groups(self):
+        hamiltonian = CompiledHamiltonian([
+            (1.0, [("PauliZ", 0), ("PauliZ", 1)]),
+            (1.0, [("PauliX", 0), ("PauliX", 1)]),
+            (1.0, [("PauliZ", 0)]),
+            (1.0, [("PauliX", 1)]),
+            (1.0, [("PauliY", 0), ("PauliZ", 1)]),
+            (1.0, []),
+        ])
+
+        groups = qubit_wise_commuting_groups(hamiltonian.x_masks, hamiltonian.z_masks)
+        self.assertEqual([group.tolist() for group in groups], [[0, 2], [1, 3], [4, 5]])
+        self.assertEqual(hamiltonian.group_terms([2]), [(1.0, [("PauliY", 0), ("PauliZ", 1)]), (1.0, [])])